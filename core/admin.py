@@ -9,6 +9,7 @@ from .models import (
     FeatureFrame,
     ModelArtifact,
     Prediction,
+    DashboardBundle,
 )
 
 @admin.register(Series)
@@ -37,4 +38,8 @@ class ModelArtifactAdmin(admin.ModelAdmin):
 
 @admin.register(Prediction)
 class PredictionAdmin(admin.ModelAdmin):
-    list_display = ("model", "date","yhat")
\ No newline at end of file
+    list_display = ("model", "date","yhat")
+
+@admin.register(DashboardBundle)
+class DashboardBundleAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "size", "etag")
@@ -0,0 +1,153 @@
+"""
+Precomputed dashboard bundle.
+
+Rendering the dashboard used to fan out into a dozen API calls, each doing
+its own ORM work on every page view. `build_dashboard_bundle()` renders
+everything the page shows (macro snapshot, downsampled chart series,
+latest prediction, top news) into one gzip-compressed JSON document at the
+end of the update pipeline. `/api/dashboard/` serves the latest bundle
+from process memory and only asks the database for a newer one every few
+seconds.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from core.conditional import make_etag
+from core.models import Series, DashboardBundle
+from core.response_cache import render_json
+from core.wire import COLUMNAR
+
+# Chart series included in the bundle, downsampled for display and sent in
+# the columnar layout (see core.wire).
+DASHBOARD_SERIES = [
+    "SPX_CLOSE", "VIX", "CPI", "CoreCPI", "Unemployment", "JoblessClaims",
+    "FFR", "US10Y", "TERM_SPREAD_10Y_2Y", "SPY_VOLUME",
+]
+DASHBOARD_MAX_POINTS = 2000
+DASHBOARD_NEWS_LIMIT = 12
+
+# How many bundles to keep in the database.
+DASHBOARD_BUNDLES_KEPT = 3
+
+# How often (seconds) a worker checks for a newer bundle.
+DASHBOARD_BUNDLE_CHECK_SECONDS = float(os.getenv("DASHBOARD_BUNDLE_CHECK_SECONDS", "10"))
+
+
+def build_dashboard_payload() -> Dict[str, Any]:
+    """The bundle contents, shaped like the individual API responses."""
+    # Imported here: core.views serves the bundle (and imports this module).
+    from core.views import build_macro_snapshot, build_news_payload, _observation_rows, _series_payload
+    from ml.predict_spx import latest_spx_prediction
+
+    series_list = list(
+        Series.objects.filter(code__in=DASHBOARD_SERIES).values("id", "code", "name")
+    )
+    rows = _observation_rows([s["id"] for s in series_list])
+    series = {
+        s["code"]: _series_payload(s, rows[s["id"]], DASHBOARD_MAX_POINTS, COLUMNAR)
+        for s in series_list
+    }
+
+    try:
+        prediction = latest_spx_prediction()
+    except RuntimeError as e:
+        print(f"Dashboard bundle: no prediction ({e})")
+        prediction = None
+
+    return {
+        "macro_snapshot": build_macro_snapshot(),
+        "series": series,
+        "prediction": prediction,
+        "news": build_news_payload(DASHBOARD_NEWS_LIMIT),
+    }
+
+
+def build_dashboard_bundle() -> DashboardBundle:
+    """
+    Render and store a new bundle. If nothing changed since the latest
+    bundle, that one is returned instead, so clients keep their ETag.
+    """
+    body = render_json(build_dashboard_payload())
+    etag = make_etag("dashboard", hashlib.sha1(body).hexdigest())
+
+    current = DashboardBundle.objects.order_by("-id").first()
+    if current is not None and current.etag == etag:
+        print("Dashboard bundle unchanged")
+        return current
+
+    bundle = DashboardBundle.objects.create(
+        data=gzip.compress(body, compresslevel=9, mtime=0),
+        etag=etag,
+        size=len(body),
+    )
+    stale = list(
+        DashboardBundle.objects.order_by("-id").values_list("id", flat=True)[DASHBOARD_BUNDLES_KEPT:]
+    )
+    DashboardBundle.objects.filter(id__in=stale).delete()
+    bundle_cache.expire()
+    print(f"Dashboard bundle {bundle.id}: {len(body)} bytes, {len(bundle.data)} gzipped")
+    return bundle
+
+
+class LoadedBundle:
+    __slots__ = ("id", "etag", "gzipped", "created_at", "_body")
+
+    def __init__(self, id: int, etag: str, gzipped: bytes, created_at: datetime):
+        self.id = id
+        self.etag = etag
+        self.gzipped = gzipped
+        self.created_at = created_at
+        self._body = None
+
+    @property
+    def body(self) -> bytes:
+        """Uncompressed JSON, for clients that don't accept gzip."""
+        if self._body is None:
+            self._body = gzip.decompress(self.gzipped)
+        return self._body
+
+
+class BundleCache:
+    """The latest DashboardBundle, held in memory."""
+
+    def __init__(self, check_interval: float = DASHBOARD_BUNDLE_CHECK_SECONDS):
+        self.check_interval = check_interval
+        self._current: Optional[LoadedBundle] = None
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+
+    def expire(self) -> None:
+        """Force the next `get()` to check for a newer bundle."""
+        self._checked_at = 0.0
+
+    def get(self) -> Optional[LoadedBundle]:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._current
+
+        latest = DashboardBundle.objects.order_by("-id").values_list("id", "etag").first()
+        with self._lock:
+            current = self._current
+            if latest is None:
+                current = None
+            elif current is None or (current.id, current.etag) != latest:
+                row = (
+                    DashboardBundle.objects
+                    .filter(id=latest[0])
+                    .values_list("id", "etag", "data", "created_at")
+                    .first()
+                )
+                if row is not None:
+                    current = LoadedBundle(row[0], row[1], bytes(row[2]), row[3])
+            self._current = current
+            self._checked_at = now
+        return current
+
+
+bundle_cache = BundleCache()
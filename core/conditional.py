@@ -0,0 +1,66 @@
+"""
+ETag / Last-Modified support for the read APIs.
+
+Each endpoint supplies a cheap validator: a few indexed lookups (series
+generations, latest row timestamps) that change whenever the response
+body would. Matching If-None-Match / If-Modified-Since requests get a
+304 without the body ever being built.
+"""
+
+import hashlib
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Optional, Tuple
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+Validator = Tuple[str, Optional[datetime]]
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong (quoted) ETag derived from the given version parts."""
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def latest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    present = [ts for ts in timestamps if ts is not None]
+    return max(present) if present else None
+
+
+def not_modified_response(request, etag: str, last_modified: Optional[datetime]):
+    """A 304 (or 412) response if the request's validators match, else None."""
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def set_validators(response, etag: str, last_modified: Optional[datetime]):
+    """Attach ETag / Last-Modified to a successful response."""
+    if response.status_code == 200:
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        # Cache, but always revalidate: data changes a few times a day.
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional(validator: Callable[..., Validator]):
+    """
+    Decorator for APIView handlers: `validator(request)` returns
+    (etag, last_modified). The handler only runs if the client's cached
+    copy is stale.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            etag, last_modified = validator(request)
+            response = not_modified_response(request, etag, last_modified)
+            if response is not None:
+                return response
+            return set_validators(handler(self, request, *args, **kwargs), etag, last_modified)
+        return wrapper
+    return decorator
@@ -1,15 +1,21 @@
 from django.core.management.base import BaseCommand
 
-from etl.fred import run_fred_etl
+from etl.fred import run_fred_etl, FRED_REVISION_DAYS
 from etl.markets import run_markets_etl
-from etl.features import build_features_for_all_dates
+from etl.derived import run_derived_etl
+from etl.features import build_features_for_all_dates, build_features_since
+from etl.ingest import earliest_change
 
 # 👇 IMPORTANT: use the NewsAPI-based ETL, not the RSS one
 from etl.news_api import run_news_etl_newsapi
 
 from ml.train_spx_model import train_spx_direction_model
+from ml.predict_spx import SPX_MODEL_NAME, store_predictions
 from ml.news_nlp import run_news_nlp
 
+from core.bundle import build_dashboard_bundle
+from core.models import ModelArtifact
+
 
 class Command(BaseCommand):
     """
@@ -17,51 +23,137 @@ class Command(BaseCommand):
 
     Steps:
 
-    1. Refresh macro data from FRED.
+    1. Refresh macro data from FRED (only recent observations unless --full).
     2. Refresh market data from yfinance.
-    3. Rebuild the FeatureFrame table.
-    4. Retrain the SPX direction model and save its artifact.
-    5. Fetch latest news from NewsAPI and store them.
-    6. Run NLP (sentiment, summary, topics) on the newest articles.
+    3. Recompute derived series (CPI YoY, term spread, SPX drawdown)
+       from their earliest changed input.
+    4. Rebuild FeatureFrame rows from the earliest changed observation
+       onwards (everything with --full or --rebuild-features).
+    5. Update the SPX direction model with the newly labeled days, or
+       retrain it from scratch (with --retrain, weekly, or on drift),
+       and save its artifact. Skipped when the training rows are
+       unchanged since the latest artifact.
+    6. Score every FeatureFrame with a new model and store the
+       Predictions (served by /api/spx-direction/ and /api/predictions/);
+       an unchanged model only scores the dates it has no Prediction for.
+    7. Fetch latest news from NewsAPI and store them.
+    8. Run NLP (sentiment, summary, topics) on the newest articles.
+    9. Build the dashboard bundle served by /api/dashboard/.
     """
 
     help = "Run all ETL + feature + model + news + NLP updates for MarketPulse."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Download the full history of every FRED series instead of only recent observations.",
+        )
+
+        parser.add_argument(
+            "--revision-days",
+            type=int,
+            default=FRED_REVISION_DAYS,
+            help=f"How far before the last stored FRED observation to re-fetch (default: {FRED_REVISION_DAYS}).",
+        )
+
+        parser.add_argument(
+            "--rebuild-features",
+            action="store_true",
+            help="Rebuild every FeatureFrame row instead of only those affected by new observations.",
+        )
+
+        parser.add_argument(
+            "--retrain",
+            action="store_true",
+            help="Retrain the SPX model from scratch instead of updating it with the newest rows.",
+        )
+
     def handle(self, *args, **options):
+        full = options["full"]
+
+        # Per-series ETL results ({code: {"first_changed": ...}}). A stage
+        # that raises part-way leaves its changes unknown, which forces a
+        # full rebuild. (run_fred_etl isolates per-series failures and only
+        # raises before writing anything, e.g. without an API key.)
+        changes = {}
+        changes_known = True
+
         # 1) FRED macro ETL
         self.stdout.write(self.style.MIGRATE_HEADING("1) FRED macro ETL"))
         try:
-            run_fred_etl()
-            self.stdout.write(self.style.SUCCESS("   ✓ FRED ETL completed."))
+            fred_results = run_fred_etl(full=full, revision_days=options["revision_days"])
+            changes.update(fred_results)
+            failed = [code for code, stats in fred_results.items() if "error" in stats]
+            if failed:
+                self.stdout.write(self.style.WARNING(f"   ! FRED ETL completed with failures: {', '.join(failed)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS("   ✓ FRED ETL completed."))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"   ✗ FRED ETL failed: {e}"))
 
         # 2) Market ETL (yfinance)
         self.stdout.write(self.style.MIGRATE_HEADING("2) Market ETL (yfinance)"))
         try:
-            run_markets_etl()
+            market_results = run_markets_etl()
+            changes.update(market_results)
             self.stdout.write(self.style.SUCCESS("   ✓ Market ETL completed."))
         except Exception as e:
+            changes_known = False
             self.stdout.write(self.style.ERROR(f"   ✗ Market ETL failed: {e}"))
 
-        # 3) Build FeatureFrame
-        self.stdout.write(self.style.MIGRATE_HEADING("3) Build FeatureFrame"))
+        # 3) Derived series
+        self.stdout.write(self.style.MIGRATE_HEADING("3) Derived series"))
+        try:
+            run_derived_etl(changes if changes_known else None, full=full)
+            self.stdout.write(self.style.SUCCESS("   ✓ Derived series updated."))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"   ✗ Derived series failed: {e}"))
+
+        # 4) Build FeatureFrame
+        self.stdout.write(self.style.MIGRATE_HEADING("4) Build FeatureFrame"))
         try:
-            build_features_for_all_dates()
-            self.stdout.write(self.style.SUCCESS("   ✓ Features built/updated."))
+            changed_since = earliest_change(changes)
+            if full or options["rebuild_features"] or not changes_known:
+                build_features_for_all_dates()
+                self.stdout.write(self.style.SUCCESS("   ✓ Features rebuilt."))
+            elif changed_since is None:
+                self.stdout.write(self.style.SUCCESS("   ✓ No observation changes; features up to date."))
+            else:
+                build_features_since(changed_since)
+                self.stdout.write(self.style.SUCCESS(f"   ✓ Features updated from {changed_since}."))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"   ✗ Feature building failed: {e}"))
 
-        # 4) Train SPX direction model
-        self.stdout.write(self.style.MIGRATE_HEADING("4) Train SPX direction model"))
+        # 5) Train SPX direction model
+        self.stdout.write(self.style.MIGRATE_HEADING("5) Train SPX direction model"))
+        previous_artifact_id = (
+            ModelArtifact.objects.filter(name=SPX_MODEL_NAME).order_by("-id").values_list("id", flat=True).first()
+        )
+        artifact, new_artifact = None, False
         try:
-            train_spx_direction_model()
-            self.stdout.write(self.style.SUCCESS("   ✓ Model trained and saved."))
+            artifact = train_spx_direction_model(full=options["retrain"])
+            new_artifact = artifact.id != previous_artifact_id
+            mode = artifact.metrics.get("mode", "full")
+            self.stdout.write(self.style.SUCCESS(f"   ✓ Model artifact {artifact.id} ({mode}) ready."))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"   ✗ Model training failed: {e}"))
 
-        # 5) News ETL (NewsAPI, from etl/news_api.py)
-        self.stdout.write(self.style.MIGRATE_HEADING("5) News ETL (NewsAPI)"))
+        # 6) Store predictions
+        self.stdout.write(self.style.MIGRATE_HEADING("6) Store SPX predictions"))
+        try:
+            if artifact is None:
+                # Training failed: keep scoring with the current model
+                artifact = ModelArtifact.objects.filter(name=SPX_MODEL_NAME).order_by("-id").first()
+            if artifact is None:
+                raise RuntimeError("No model artifact found in database. Train the model first.")
+            scored = store_predictions(artifact, new_artifact)
+            self.stdout.write(self.style.SUCCESS(f"   ✓ Stored predictions for {scored} dates."))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"   ✗ Storing predictions failed: {e}"))
+
+        # 7) News ETL (NewsAPI, from etl/news_api.py)
+        self.stdout.write(self.style.MIGRATE_HEADING("7) News ETL (NewsAPI)"))
         try:
             # Call the NewsAPI ETL with page_size parameter
             run_news_etl_newsapi(page_size=25)
@@ -69,8 +161,8 @@ class Command(BaseCommand):
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"   ✗ News ETL failed: {e}"))
 
-        # 6) News NLP (sentiment + topics)
-        self.stdout.write(self.style.MIGRATE_HEADING("6) News NLP"))
+        # 8) News NLP (sentiment + topics)
+        self.stdout.write(self.style.MIGRATE_HEADING("8) News NLP"))
         try:
             # Process only 5 articles at a time to avoid OOM crashes on Railway free tier
             run_news_nlp(limit=5)
@@ -78,4 +170,12 @@ class Command(BaseCommand):
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"   ✗ News NLP failed: {e}"))
 
+        # 9) Dashboard bundle
+        self.stdout.write(self.style.MIGRATE_HEADING("9) Dashboard bundle"))
+        try:
+            build_dashboard_bundle()
+            self.stdout.write(self.style.SUCCESS("   ✓ Dashboard bundle built."))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"   ✗ Dashboard bundle failed: {e}"))
+
         self.stdout.write(self.style.SUCCESS("✅ MarketPulse update pipeline completed."))
\ No newline at end of file
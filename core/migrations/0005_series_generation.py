@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_change_modelartifact_to_store_binary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='series',
+            name='generation',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_dashboardbundle'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='newsarticle',
+            options={'ordering': ['-published_at', '-id']},
+        ),
+        migrations.AlterField(
+            model_name='newsarticle',
+            name='published_at',
+            field=models.DateTimeField(),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['-published_at', '-id'], name='news_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['source', '-published_at', '-id'], name='news_source_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsarticle',
+            index=models.Index(fields=['sentiment_label', '-published_at', '-id'], name='news_sentiment_published_idx'),
+        ),
+    ]
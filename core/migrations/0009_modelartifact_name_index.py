@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_news_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='modelartifact',
+            index=models.Index(fields=['name', '-id'], name='artifact_name_idx'),
+        ),
+    ]
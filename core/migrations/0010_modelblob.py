@@ -0,0 +1,62 @@
+# Generated by Django 5.1.6 on 2026-10-17 09:12
+
+import hashlib
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_data_to_blobs(apps, schema_editor):
+    ModelArtifact = apps.get_model("core", "ModelArtifact")
+    ModelBlob = apps.get_model("core", "ModelBlob")
+    for artifact in ModelArtifact.objects.only("id").iterator():
+        raw = bytes(ModelArtifact.objects.filter(id=artifact.id).values_list("data", flat=True).get())
+        sha = hashlib.sha256(raw).hexdigest()
+        ModelBlob.objects.get_or_create(sha256=sha, defaults={"data": zlib.compress(raw), "size": len(raw)})
+        ModelArtifact.objects.filter(id=artifact.id).update(blob_id=sha)
+
+
+def move_blobs_to_data(apps, schema_editor):
+    ModelArtifact = apps.get_model("core", "ModelArtifact")
+    for artifact in ModelArtifact.objects.select_related("blob").iterator():
+        ModelArtifact.objects.filter(id=artifact.id).update(data=zlib.decompress(bytes(artifact.blob.data)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_modelartifact_name_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='modelartifact',
+            name='blob',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='artifacts', to='core.modelblob'),
+        ),
+        migrations.AlterField(
+            model_name='modelartifact',
+            name='data',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.RunPython(move_data_to_blobs, move_blobs_to_data),
+        migrations.RemoveField(
+            model_name='modelartifact',
+            name='data',
+        ),
+        migrations.AlterField(
+            model_name='modelartifact',
+            name='blob',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='artifacts', to='core.modelblob'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_modelblob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prediction',
+            name='scored_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+    ]
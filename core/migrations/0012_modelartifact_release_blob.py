@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-17 07:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_prediction_scored_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='modelartifact',
+            name='blob',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='artifacts', to='core.modelblob'),
+        ),
+    ]
@@ -7,6 +7,10 @@ class Series(models.Model):
     name = models.CharField(max_length=256, unique=True)
     freq = models.CharField(max_length=8, default="D")
     source = models.CharField(max_length=32, default="FRED")
+    # Bumped whenever this series' observations change, so in-process
+    # caches in every worker can tell their copy is stale.
+    generation = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(null=True, blank=True)  # last generation bump
 
     def __str__(self):
         return self.code
@@ -36,7 +40,7 @@ class NewsArticle(models.Model):
     source = models.CharField(max_length=100)              # e.g. 'Reuters', 'CNBC'
     title = models.CharField(max_length=500)
     url = models.URLField(max_length=500)
-    published_at = models.DateTimeField(db_index=True)
+    published_at = models.DateTimeField()
 
     # Optional metadata
     tickers = models.JSONField(default=list, blank=True)   # e.g. ["AAPL", "MSFT"]
@@ -57,9 +61,17 @@ class NewsArticle(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
-        ordering = ["-published_at"]
+        ordering = ["-published_at", "-id"]
+        # Keyset pagination for /api/news/ walks these newest-first,
+        # optionally within one source or sentiment.
+        indexes = [
+            models.Index(fields=["-published_at", "-id"], name="news_published_idx"),
+            models.Index(fields=["source", "-published_at", "-id"], name="news_source_published_idx"),
+            models.Index(fields=["sentiment_label", "-published_at", "-id"], name="news_sentiment_published_idx"),
+        ]
 
     def __str__(self):
         return f"[{self.source}] {self.title[:80]}"
@@ -70,20 +82,55 @@ class FeatureFrame(models.Model):
     features = models.JSONField(default=dict)
     target = models.FloatField(null=True, blank=True)
     label = models.IntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class ModelBlob(models.Model):
+    """
+    A serialized model, stored once per content hash (see ml.artifact_store).
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)  # of the uncompressed pickle
+    data = models.BinaryField()  # zlib-compressed joblib pickle
+    size = models.PositiveIntegerField(default=0)  # uncompressed bytes
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"ModelBlob {self.sha256[:12]}"
 
 
 class ModelArtifact(models.Model):
     name = models.CharField(max_length=64)
-    data = models.BinaryField()  # Store serialized model as binary blob
+    # Artifacts with identical models share one blob; old artifacts kept
+    # for their Predictions drop it (see ml.train_spx_model)
+    blob = models.ForeignKey(ModelBlob, on_delete=models.PROTECT, related_name="artifacts", null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     metrics = models.JSONField(default=dict)
 
+    class Meta:
+        # Latest artifact per name (see ml.model_cache)
+        indexes = [models.Index(fields=["name", "-id"], name="artifact_name_idx")]
+
 
 class Prediction(models.Model):
     model = models.ForeignKey(ModelArtifact, on_delete=models.CASCADE)
     date = models.DateField(db_index=True)
     yhat = models.FloatField()
     details = models.JSONField(default=dict)
+    # Compared with FeatureFrame.updated_at to find stale predictions
+    scored_at = models.DateTimeField(auto_now=True, null=True)
 
     class Meta:
-        unique_together = ("model", "date")
\ No newline at end of file
+        unique_together = ("model", "date")
+
+class DashboardBundle(models.Model):
+    """
+    Everything the dashboard page needs, rendered once at the end of the
+    update pipeline (see core.bundle) and stored as gzip-compressed JSON.
+    """
+    data = models.BinaryField()  # gzip-compressed JSON payload
+    etag = models.CharField(max_length=64)
+    size = models.PositiveIntegerField(default=0)  # uncompressed bytes
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"DashboardBundle {self.created_at:%Y-%m-%d %H:%M}"
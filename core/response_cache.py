@@ -0,0 +1,48 @@
+"""
+Versioned response cache for the read APIs.
+
+Cache keys embed the data generation of everything a response depends on
+(see Series.generation), so entries never need explicit invalidation: an
+ETL write bumps the generation and the next request simply misses. Values
+are fully rendered JSON bodies, so a hit skips both the ORM scan and
+serialization.
+"""
+
+import hashlib
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+def make_cache_key(prefix: str, versions: Iterable[Tuple[Any, ...]], params: Dict[str, str]) -> str:
+    """
+    Key for a response of kind `prefix` built from data at `versions`
+    (e.g. [(series_id, generation), ...]) with request `params`.
+    """
+    raw = repr((list(versions), sorted(params.items())))
+    return f"mp:{prefix}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def render_json(data: Any) -> bytes:
+    return JSONRenderer().render(data)
+
+
+def cached_body(key: str, build: Callable[[], Any], render: Callable[[Any], bytes] = render_json) -> bytes:
+    """
+    Rendered body for `key`, calling `render(build())` only on a miss.
+    `render` defaults to JSON; pass e.g. `bytes` for prebuilt binary bodies.
+    """
+    body = cache.get(key)
+    if body is None:
+        body = render(build())
+        cache.set(key, body, settings.API_CACHE_SECONDS)
+    return body
+
+
+def json_response(body: bytes, status: int = 200) -> HttpResponse:
+    return HttpResponse(body, content_type=JSON_CONTENT_TYPE, status=status)
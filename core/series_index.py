@@ -0,0 +1,171 @@
+"""
+In-process as-of index over Observation data.
+
+Point-in-time lookups ("latest value of CPI on or before date d") used to
+cost two queries each. SeriesIndex loads a series once into sorted NumPy
+date/value arrays and answers lookups with binary search, for one date or
+for a whole array of dates at once.
+
+Entries are tagged with the series' `generation`. Every write to a series
+bumps it (`bump_generation`), and the index periodically compares its
+tags against the database with a single query, so workers drop stale
+copies after the ETL runs in another process.
+"""
+
+import os
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import Series, Observation
+
+# How often (seconds) lookups re-check generations against the database.
+# Every request also re-checks once (see core.signals).
+SERIES_INDEX_CHECK_SECONDS = float(os.getenv("SERIES_INDEX_CHECK_SECONDS", "5"))
+
+
+class _Entry:
+    __slots__ = ("series_id", "generation", "dates", "values")
+
+    def __init__(self, series_id, generation, dates, values):
+        self.series_id = series_id
+        self.generation = generation
+        self.dates = dates
+        self.values = values
+
+
+class SeriesIndex:
+    def __init__(self, check_interval: float = SERIES_INDEX_CHECK_SECONDS):
+        self.check_interval = check_interval
+        self._entries: Dict[str, Optional[_Entry]] = {}  # None = unknown code
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+
+    # --- cache maintenance -------------------------------------------------
+
+    def invalidate(self, code: Optional[str] = None) -> None:
+        """Drop one series (or everything) from the index."""
+        with self._lock:
+            if code is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(code, None)
+
+    def invalidate_ids(self, series_ids: Iterable[int]) -> None:
+        ids = set(series_ids)
+        with self._lock:
+            stale = [
+                code for code, entry in self._entries.items()
+                if entry is not None and entry.series_id in ids
+            ]
+            for code in stale:
+                del self._entries[code]
+
+    def expire(self) -> None:
+        """Force the next lookup to re-check generations."""
+        self._checked_at = 0.0
+
+    def validate(self, force: bool = False) -> None:
+        """
+        Drop entries whose generation no longer matches the database.
+        Throttled to once per `check_interval` seconds unless `force`.
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        current = {
+            code: (series_id, generation)
+            for code, series_id, generation in Series.objects.values_list("code", "id", "generation")
+        }
+        with self._lock:
+            for code, entry in list(self._entries.items()):
+                if entry is None:
+                    stale = code in current
+                else:
+                    stale = current.get(code) != (entry.series_id, entry.generation)
+                if stale:
+                    del self._entries[code]
+        self._checked_at = now
+
+    def _load(self, code: str) -> Optional[_Entry]:
+        row = Series.objects.filter(code=code).values_list("id", "generation").first()
+        if row is None:
+            return None
+        series_id, generation = row
+        # Generation is read before the data, so a concurrent write can only
+        # make this entry look older than it is, never newer.
+        pairs = list(
+            Observation.objects
+            .filter(series_id=series_id)
+            .order_by("date")
+            .values_list("date", "value")
+        )
+        dates = np.array([d for d, _ in pairs], dtype="datetime64[D]")
+        values = np.array([v for _, v in pairs], dtype=float)
+        return _Entry(series_id, generation, dates, values)
+
+    def _entry(self, code: str) -> Optional[_Entry]:
+        self.validate()
+        with self._lock:
+            if code in self._entries:
+                return self._entries[code]
+        entry = self._load(code)
+        with self._lock:
+            self._entries[code] = entry
+        return entry
+
+    # --- lookups -----------------------------------------------------------
+
+    def arrays(self, code: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(dates, values) arrays for `code`, or None if the series is unknown."""
+        entry = self._entry(code)
+        if entry is None:
+            return None
+        return entry.dates, entry.values
+
+    def value_on_or_before(self, code: str, d: date) -> Optional[float]:
+        """Latest value of `code` on or before `d`, or None."""
+        entry = self._entry(code)
+        if entry is None:
+            return None
+        i = np.searchsorted(entry.dates, np.datetime64(d, "D"), side="right") - 1
+        if i < 0:
+            return None
+        return float(entry.values[i])
+
+    def values_on_or_before(self, code: str, dates: np.ndarray) -> np.ndarray:
+        """
+        Vectorized `value_on_or_before` over an array of dates
+        (anything convertible to datetime64[D]); NaN where nothing exists.
+        """
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        out = np.full(dates.shape, np.nan)
+        entry = self._entry(code)
+        if entry is None or len(entry.dates) == 0:
+            return out
+        idx = np.searchsorted(entry.dates, dates, side="right") - 1
+        found = idx >= 0
+        out[found] = entry.values[idx[found]]
+        return out
+
+
+series_index = SeriesIndex()
+
+
+def bump_generation(series_ids: Iterable[int]) -> None:
+    """
+    Mark series as changed: bump their generation in the database (seen by
+    other processes on their next check) and drop them from this process'
+    index right away.
+    """
+    ids = list(series_ids)
+    if not ids:
+        return
+    Series.objects.filter(pk__in=ids).update(generation=F("generation") + 1, updated_at=timezone.now())
+    series_index.invalidate_ids(ids)
+
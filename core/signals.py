@@ -0,0 +1,33 @@
+"""
+Keep the in-process SeriesIndex coherent with ORM writes.
+
+Bulk writes from the ETL call `bump_generation` themselves (bulk_create /
+bulk_update / update() don't send model signals); these receivers cover
+saves and deletes made through the ORM elsewhere (admin, shell, tests).
+"""
+
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Series, Observation
+from core.series_index import bump_generation, series_index
+
+
+@receiver(post_save, sender=Observation)
+@receiver(post_delete, sender=Observation)
+def observation_changed(sender, instance, **kwargs):
+    bump_generation([instance.series_id])
+
+
+@receiver(post_save, sender=Series)
+@receiver(post_delete, sender=Series)
+def series_changed(sender, instance, **kwargs):
+    series_index.invalidate(instance.code)
+
+
+@receiver(request_started)
+def request_started_handler(sender, **kwargs):
+    # Re-check generations once per request so a worker never serves data
+    # older than the last completed ETL write.
+    series_index.expire()
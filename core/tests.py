@@ -116,7 +116,9 @@ class TimeSeriesViewTest(TestCase):
     """Test TimeSeriesView API endpoint."""
     
     def setUp(self):
+        from django.core.cache import cache
         from rest_framework.test import APIClient
+        cache.clear()
         self.client = APIClient()
         self.series = Series.objects.create(
             code="TEST_SERIES",
@@ -134,9 +136,97 @@ class TimeSeriesViewTest(TestCase):
         """Test successful time series retrieval."""
         response = self.client.get("/api/timeseries/?code=TEST_SERIES")
         self.assertEqual(response.status_code, 200)
-        self.assertIn("data", response.data)
-        self.assertEqual(len(response.data["data"]), 1)
+        self.assertIn("data", response.json())
+        self.assertEqual(len(response.json()["data"]), 1)
+
+    def test_timeseries_endpoint_cached_until_generation_changes(self):
+        """Test that repeat requests skip the observation query until data changes."""
+        from etl.ingest import upsert_observations
+        self.client.get("/api/timeseries/?code=TEST_SERIES")
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/timeseries/?code=TEST_SERIES")
+        self.assertEqual(response.json()["count"], 1)
+
+        upsert_observations(self.series, [(date.today() + timedelta(days=1), 101.0)])
+        response = self.client.get("/api/timeseries/?code=TEST_SERIES")
+        self.assertEqual(response.json()["count"], 2)
     
+    def test_timeseries_endpoint_conditional_get(self):
+        """Test ETag revalidation returns 304 until the series changes."""
+        from etl.ingest import upsert_observations
+        response = self.client.get("/api/timeseries/?code=TEST_SERIES")
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/timeseries/?code=TEST_SERIES", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        upsert_observations(self.series, [(date.today(), 123.0)])
+        response = self.client.get("/api/timeseries/?code=TEST_SERIES", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_timeseries_endpoint_range_and_downsampling(self):
+        """Test start/end slicing and max_points downsampling."""
+        for i in range(1, 100):
+            Observation.objects.create(series=self.series, date=date.today() - timedelta(days=i), value=float(i % 10))
+
+        start = (date.today() - timedelta(days=9)).isoformat()
+        response = self.client.get(f"/api/timeseries/?code=TEST_SERIES&start={start}")
+        self.assertEqual(response.json()["count"], 10)
+        self.assertEqual(response.json()["data"][0]["date"], start)
+
+        payload = self.client.get("/api/timeseries/?code=TEST_SERIES&max_points=20").json()
+        self.assertEqual(payload["count"], 20)
+        self.assertEqual(payload["total"], 100)
+        self.assertEqual(payload["data"][-1]["date"], date.today().isoformat())
+
+    def test_timeseries_endpoint_compact_layouts(self):
+        """Test the columnar and binary layouts round-trip the rows layout."""
+        from core import wire
+        for i in range(1, 30):
+            Observation.objects.create(series=self.series, date=date.today() - timedelta(days=i * 2), value=i + 0.5)
+        rows = self.client.get("/api/timeseries/?code=TEST_SERIES").json()
+        expected = [(date.fromisoformat(p["date"]), p["value"]) for p in rows["data"]]
+
+        columnar = self.client.get("/api/timeseries/?code=TEST_SERIES&layout=columnar")
+        self.assertEqual(wire.decode_columnar(columnar.json()), expected)
+        self.assertLess(len(columnar.content), len(self.client.get("/api/timeseries/?code=TEST_SERIES").content) / 2)
+
+        binary = self.client.get("/api/timeseries/?code=TEST_SERIES", HTTP_ACCEPT=wire.BINARY_MEDIA_TYPE)
+        self.assertEqual(binary["Content-Type"], wire.BINARY_MEDIA_TYPE)
+        self.assertEqual(len(binary.content), 16 + 8 * len(expected))
+        dates, values, total = wire.decode_binary(binary.content)
+        self.assertEqual(total, len(expected))
+        self.assertEqual(list(dates.astype(object)), [d for d, _ in expected])
+        self.assertEqual(list(values), [v for _, v in expected])
+
+        self.assertEqual(self.client.get("/api/timeseries/?code=TEST_SERIES&layout=xml").status_code, 400)
+
+    def test_timeseries_endpoint_streaming(self):
+        """Test the streamed rows layout matches the buffered one, chunk by chunk."""
+        import json
+        from unittest.mock import patch
+        for i in range(1, 12):
+            Observation.objects.create(series=self.series, date=date.today() - timedelta(days=i), value=i / 3)
+        expected = self.client.get("/api/timeseries/?code=TEST_SERIES").json()
+
+        with patch("core.views.TIMESERIES_STREAM_CHUNK_SIZE", 5):
+            response = self.client.get("/api/timeseries/?code=TEST_SERIES&stream=1")
+            chunks = list(response.streaming_content)
+        self.assertIn("ETag", response)
+        self.assertEqual(len(chunks), 5)  # head, 5 + 5 + 2 points, tail
+        self.assertEqual(json.loads(b"".join(chunks)), expected)
+
+        self.assertEqual(self.client.get("/api/timeseries/?code=TEST_SERIES&stream=1&max_points=10").status_code, 400)
+
+    def test_timeseries_endpoint_invalid_range(self):
+        """Test that malformed range parameters are rejected."""
+        self.assertEqual(self.client.get("/api/timeseries/?code=TEST_SERIES&start=yesterday").status_code, 400)
+        self.assertEqual(self.client.get("/api/timeseries/?code=TEST_SERIES&max_points=2").status_code, 400)
+
     def test_timeseries_endpoint_missing_code(self):
         """Test time series endpoint with missing code parameter."""
         response = self.client.get("/api/timeseries/")
@@ -148,3 +238,357 @@ class TimeSeriesViewTest(TestCase):
         response = self.client.get("/api/timeseries/?code=INVALID")
         self.assertEqual(response.status_code, 404)
         self.assertIn("error", response.data)
+
+
+class TimeSeriesBatchViewTest(TestCase):
+    """Test the /api/timeseries/batch/ endpoint."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from rest_framework.test import APIClient
+        cache.clear()
+        self.client = APIClient()
+        self.daily = Series.objects.create(code="DAILY", name="Daily", freq="D", source="TEST")
+        self.sparse = Series.objects.create(code="SPARSE", name="Sparse", freq="W", source="TEST")
+        for day in range(1, 8):
+            Observation.objects.create(series=self.daily, date=date(2024, 1, day), value=float(day))
+        for day in (2, 5):
+            Observation.objects.create(series=self.sparse, date=date(2024, 1, day), value=day * 10.0)
+
+    def test_series_layout(self):
+        """Test per-series payloads in request order, with one observation query."""
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/timeseries/batch/?codes=SPARSE,DAILY,NOPE")
+        payload = response.json()
+        self.assertEqual([s["code"] for s in payload["series"]], ["SPARSE", "DAILY"])
+        self.assertEqual(payload["series"][0]["count"], 2)
+        self.assertEqual(payload["series"][1]["count"], 7)
+        self.assertEqual(payload["missing"], ["NOPE"])
+
+    def test_columnar_layout(self):
+        """Test per-series payloads in the columnar layout."""
+        payload = self.client.get("/api/timeseries/batch/?codes=SPARSE&layout=columnar").json()
+        self.assertEqual(payload["series"][0]["start"], "2024-01-02")
+        self.assertEqual(payload["series"][0]["deltas"], [0, 3])
+        self.assertEqual(payload["series"][0]["values"], [20.0, 50.0])
+
+    def test_frame_layout_and_ffill(self):
+        """Test date alignment with and without forward-fill."""
+        url = "/api/timeseries/batch/?codes=DAILY,SPARSE&layout=frame&start=2024-01-02&end=2024-01-04"
+        payload = self.client.get(url).json()
+        self.assertEqual(payload["dates"], ["2024-01-02", "2024-01-03", "2024-01-04"])
+        self.assertEqual(payload["columns"]["DAILY"], [2.0, 3.0, 4.0])
+        self.assertEqual(payload["columns"]["SPARSE"], [20.0, None, None])
+
+        payload = self.client.get(url + "&ffill=1").json()
+        self.assertEqual(payload["columns"]["SPARSE"], [20.0, 20.0, 20.0])
+
+    def test_cached_and_conditional(self):
+        """Test caching and ETags track every series' generation."""
+        from etl.ingest import upsert_observations
+        url = "/api/timeseries/batch/?codes=DAILY,SPARSE"
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        upsert_observations(self.sparse, [(date(2024, 1, 9), 90.0)])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["series"][1]["count"], 3)
+
+    def test_invalid_requests(self):
+        """Test missing/unknown codes and bad parameters."""
+        self.assertEqual(self.client.get("/api/timeseries/batch/").status_code, 400)
+        self.assertEqual(self.client.get("/api/timeseries/batch/?codes=NOPE").status_code, 404)
+        self.assertEqual(self.client.get("/api/timeseries/batch/?codes=DAILY&layout=wide").status_code, 400)
+        self.assertEqual(self.client.get("/api/timeseries/batch/?codes=DAILY&end=soon").status_code, 400)
+
+
+class DashboardBundleTest(TestCase):
+    """Test building and serving the precomputed dashboard bundle."""
+
+    def setUp(self):
+        from rest_framework.test import APIClient
+        from core.bundle import bundle_cache
+        bundle_cache.expire()
+        self.client = APIClient()
+        spx = Series.objects.create(code="SPX_CLOSE", name="S&P 500", freq="D", source="TEST")
+        for i in range(50):
+            Observation.objects.create(series=spx, date=date(2024, 1, 1) + timedelta(days=i), value=100.0 + i)
+        FeatureFrame.objects.create(date=date(2024, 2, 19), features={"spx_close": 149.0, "vix_close": 15.0})
+        NewsArticle.objects.create(
+            source="Test Source",
+            title="Bundle Article",
+            url="https://example.com/bundle",
+            published_at=timezone.now(),
+        )
+
+    def _get_json(self, response):
+        import gzip
+        import json
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        return json.loads(gzip.decompress(response.content))
+
+    def test_no_bundle(self):
+        """Test the endpoint reports a missing bundle."""
+        self.assertEqual(self.client.get("/api/dashboard/").status_code, 503)
+
+    def test_bundle_contents_and_serving(self):
+        """Test the bundle holds every dashboard section and is served from memory."""
+        from core.bundle import build_dashboard_bundle
+        build_dashboard_bundle()
+
+        response = self.client.get("/api/dashboard/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        payload = self._get_json(response)
+        self.assertEqual(payload["series"]["SPX_CLOSE"]["count"], 50)
+        self.assertEqual(payload["macro_snapshot"]["as_of"], "2024-02-19")
+        self.assertIsNone(payload["prediction"])  # no model trained
+        self.assertEqual(payload["news"]["articles"][0]["title"], "Bundle Article")
+
+        etag = response["ETag"]
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/dashboard/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            plain = self.client.get("/api/dashboard/")
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertEqual(plain.json(), payload)
+
+    def test_gzip_refused_by_qvalue(self):
+        """Test gzip;q=0 (or a refused wildcard) gets the plain body."""
+        from core.bundle import build_dashboard_bundle
+        build_dashboard_bundle()
+
+        for header in ("gzip;q=0, deflate", "deflate, *;q=0", "*;q=0.5, gzip; q=0"):
+            response = self.client.get("/api/dashboard/", HTTP_ACCEPT_ENCODING=header)
+            self.assertNotIn("Content-Encoding", response, header)
+            self.assertEqual(response.json()["macro_snapshot"]["as_of"], "2024-02-19")
+        self._get_json(self.client.get("/api/dashboard/", HTTP_ACCEPT_ENCODING="gzip;q=0.8, *;q=0"))
+        self._get_json(self.client.get("/api/dashboard/", HTTP_ACCEPT_ENCODING="br, *"))
+
+    def test_rebuild(self):
+        """Test unchanged data reuses the bundle and new data replaces it."""
+        from core.bundle import build_dashboard_bundle
+        from core.models import DashboardBundle
+        first = build_dashboard_bundle()
+        self.assertEqual(build_dashboard_bundle().pk, first.pk)
+
+        FeatureFrame.objects.create(date=date(2024, 2, 20), features={"spx_close": 150.0})
+        second = build_dashboard_bundle()
+        self.assertNotEqual(second.etag, first.etag)
+        self.assertEqual(DashboardBundle.objects.count(), 2)
+
+        response = self.client.get("/api/dashboard/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["ETag"], second.etag)
+        self.assertEqual(self._get_json(response)["macro_snapshot"]["as_of"], "2024-02-20")
+
+
+class SeriesIndexTest(TestCase):
+    """Test the in-process as-of SeriesIndex."""
+
+    def setUp(self):
+        from core.series_index import SeriesIndex
+        self.index = SeriesIndex(check_interval=3600)
+        self.series = Series.objects.create(code="IDX", name="Index Test", freq="D", source="TEST")
+        for day, value in [(1, 10.0), (3, 30.0), (7, 70.0)]:
+            Observation.objects.create(series=self.series, date=date(2024, 1, day), value=value)
+
+    def test_scalar_lookup(self):
+        """Test as-of lookups before, on and between observations."""
+        self.assertIsNone(self.index.value_on_or_before("IDX", date(2023, 12, 31)))
+        self.assertEqual(self.index.value_on_or_before("IDX", date(2024, 1, 3)), 30.0)
+        self.assertEqual(self.index.value_on_or_before("IDX", date(2024, 1, 6)), 30.0)
+        self.assertEqual(self.index.value_on_or_before("IDX", date(2024, 2, 1)), 70.0)
+        self.assertIsNone(self.index.value_on_or_before("MISSING", date(2024, 1, 1)))
+
+    def test_vectorized_lookup(self):
+        """Test as-of lookups over an array of dates."""
+        import numpy as np
+        days = np.arange("2023-12-31", "2024-01-09", dtype="datetime64[D]")
+        values = self.index.values_on_or_before("IDX", days)
+        expected = [np.nan, 10, 10, 30, 30, 30, 30, 70, 70]
+        np.testing.assert_array_equal(values, np.array(expected, dtype=float))
+
+    def test_generation_bump_invalidates(self):
+        """Test that a bulk write made elsewhere is picked up after a generation check."""
+        from django.db.models import F
+        self.assertEqual(self.index.value_on_or_before("IDX", date(2024, 1, 9)), 70.0)
+
+        # Simulate another process: bulk write (no signals) + generation bump.
+        Observation.objects.bulk_create([Observation(series=self.series, date=date(2024, 1, 8), value=80.0)])
+        Series.objects.filter(pk=self.series.pk).update(generation=F("generation") + 1)
+        self.assertEqual(self.index.value_on_or_before("IDX", date(2024, 1, 9)), 70.0)
+
+        self.index.validate(force=True)
+        self.assertEqual(self.index.value_on_or_before("IDX", date(2024, 1, 9)), 80.0)
+
+    def test_ingest_bumps_generation(self):
+        """Test that the ETL upsert bumps the series generation."""
+        from etl.ingest import upsert_observations
+        before = Series.objects.get(pk=self.series.pk).generation
+
+        upsert_observations(self.series, [(date(2024, 1, 7), 70.0)])
+        self.assertEqual(Series.objects.get(pk=self.series.pk).generation, before)
+
+        upsert_observations(self.series, [(date(2024, 1, 7), 71.0)])
+        self.assertEqual(Series.objects.get(pk=self.series.pk).generation, before + 1)
+
+
+class MacroSnapshotViewTest(TestCase):
+    """Test MacroSnapshotView API endpoint."""
+
+    def setUp(self):
+        from rest_framework.test import APIClient
+        self.client = APIClient()
+        self.as_of = date(2024, 6, 3)
+        cpi = Series.objects.create(code="CPI", name="CPI", freq="M", source="FRED")
+        for month in range(6, 13):
+            Observation.objects.create(series=cpi, date=date(2023, month, 1), value=300.0)
+        for month in range(1, 7):
+            Observation.objects.create(series=cpi, date=date(2024, month, 1), value=309.0)
+        spx = Series.objects.create(code="SPX_CLOSE", name="S&P 500 Close", freq="D", source="YF")
+        for day, value in [(date(2024, 5, 30), 100.0), (date(2024, 5, 31), 120.0), (self.as_of, 90.0)]:
+            Observation.objects.create(series=spx, date=day, value=value)
+        from etl.derived import run_derived_etl
+        run_derived_etl()
+        FeatureFrame.objects.create(
+            date=self.as_of,
+            features={"spx_close": 90.0, "vix_close": 20.0, "unrate": 4.0, "us10y": 4.0, "us2y": 4.5},
+        )
+
+    def test_macro_snapshot_conditional_get(self):
+        """Test that the snapshot revalidates to 304 until features change."""
+        etag = self.client.get("/api/macro-snapshot/")["ETag"]
+
+        response = self.client.get("/api/macro-snapshot/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        FeatureFrame.objects.create(date=self.as_of + timedelta(days=1), features={"spx_close": 91.0})
+        response = self.client.get("/api/macro-snapshot/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_macro_snapshot(self):
+        """Test CPI YoY and drawdown in the snapshot."""
+        response = self.client.get("/api/macro-snapshot/")
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(response.data["cpi_yoy"], 3.0)
+        self.assertAlmostEqual(response.data["spx_drawdown"], -0.25)
+        self.assertEqual(response.data["as_of"], "2024-06-03")
+
+
+class NewsListViewTest(TestCase):
+    """Test NewsListView API endpoint."""
+
+    def setUp(self):
+        from rest_framework.test import APIClient
+        self.client = APIClient()
+        self.article = NewsArticle.objects.create(
+            source="Test Source",
+            title="Stocks rally",
+            url="https://example.com/a",
+            published_at=timezone.now(),
+        )
+
+    def test_news_conditional_get(self):
+        """Test that news revalidates to 304 until an article is added or annotated."""
+        response = self.client.get("/api/news/?limit=5")
+        etag = response["ETag"]
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get("/api/news/?limit=5", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # A different query is a different representation
+        response = self.client.get("/api/news/?limit=6", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        self.article.sentiment_label = "POSITIVE"
+        self.article.save()
+        response = self.client.get("/api/news/?limit=5", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class NewsPaginationTest(TestCase):
+    """Test keyset pagination and filters on /api/news/."""
+
+    def setUp(self):
+        from rest_framework.test import APIClient
+        self.client = APIClient()
+        now = timezone.now().replace(microsecond=0)
+        specs = [
+            ("Reuters", "POSITIVE", "inflation, stocks", ["SPY"], 0),
+            ("CNBC", "NEGATIVE", "bonds", [], 0),  # same timestamp: tie broken by id
+            ("Reuters", "NEGATIVE", "jobs", ["AAPL", "MSFT"], 1),
+            ("Bloomberg", "POSITIVE", "inflation", ["MSFT"], 2),
+            ("Reuters", "", "", [], 3),
+        ]
+        for i, (source, label, topics, tickers, hours_ago) in enumerate(specs):
+            NewsArticle.objects.create(
+                source=source,
+                title=f"Article {i}",
+                url=f"https://example.com/{i}",
+                published_at=now - timedelta(hours=hours_ago),
+                sentiment_label=label,
+                topics=topics,
+                tickers=tickers,
+            )
+
+    def _titles(self, url):
+        titles = []
+        while url:
+            payload = self.client.get(url).json()
+            titles += [a["title"] for a in payload["articles"]]
+            cursor = payload["next_cursor"]
+            url = cursor and f"{url.split('&cursor=')[0]}&cursor={cursor}"
+        return titles
+
+    def test_pages_cover_everything_once(self):
+        """Test that walking the cursors returns every article once, newest first."""
+        self.assertEqual(
+            self._titles("/api/news/?limit=2"),
+            ["Article 1", "Article 0", "Article 2", "Article 3", "Article 4"],
+        )
+
+    def test_filters(self):
+        """Test source, sentiment, topic and ticker filters."""
+        self.assertEqual(self._titles("/api/news/?limit=1&source=Reuters"), ["Article 0", "Article 2", "Article 4"])
+        self.assertEqual(self._titles("/api/news/?limit=5&sentiment_label=negative"), ["Article 1", "Article 2"])
+        self.assertEqual(self._titles("/api/news/?limit=5&topic=Inflation"), ["Article 0", "Article 3"])
+        self.assertEqual(self._titles("/api/news/?limit=5&ticker=msft"), ["Article 2", "Article 3"])
+
+    def test_page_query_count(self):
+        """Test a page costs the validator and one page query, with no COUNT."""
+        first = self.client.get("/api/news/?limit=2").json()
+        with self.assertNumQueries(2):
+            self.client.get(f"/api/news/?limit=2&cursor={first['next_cursor']}")
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected."""
+        self.assertEqual(self.client.get("/api/news/?cursor=not-a-cursor").status_code, 400)
+
+
+class DownsampleTest(TestCase):
+    """Test Largest-Triangle-Three-Buckets downsampling."""
+
+    def test_lttb_keeps_endpoints_and_spikes(self):
+        """Test that LTTB keeps the first/last points and an isolated spike."""
+        import numpy as np
+        from core.downsample import lttb_indices
+
+        x = np.arange(1000, dtype=float)
+        y = np.sin(x / 50.0)
+        y[437] = 25.0
+
+        kept = lttb_indices(x, y, 50)
+
+        self.assertEqual(len(kept), 50)
+        self.assertEqual(kept[0], 0)
+        self.assertEqual(kept[-1], 999)
+        self.assertIn(437, kept)
+        self.assertTrue(np.all(np.diff(kept) > 0))
+
+    def test_lttb_short_series_untouched(self):
+        """Test that series shorter than the budget are returned as-is."""
+        import numpy as np
+        from core.downsample import lttb_indices
+        np.testing.assert_array_equal(lttb_indices(np.arange(5.0), np.arange(5.0), 10), np.arange(5))
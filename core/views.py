@@ -1,14 +1,29 @@
 from django.shortcuts import render  # optional, safe to keep
 from django.views.generic import TemplateView
-from datetime import timedelta
+from datetime import date, datetime
+from typing import Dict, Optional
+
+import numpy as np
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from core.models import Series, Observation, NewsArticle, FeatureFrame
-from ml.predict_spx import predict_latest_spx_direction
+from django.db import connection
+from django.db.models import Max, OuterRef, Q, Subquery
+
+from core.models import Series, Observation, NewsArticle, FeatureFrame, ModelArtifact, Prediction
+from core.series_index import series_index
+from core.response_cache import make_cache_key, cached_body, json_response
+from core.downsample import lttb_indices
+from core.conditional import conditional, make_etag, latest, not_modified_response, set_validators
+from core.bundle import bundle_cache
+from core import wire
+from ml.predict_spx import SPX_MODEL_NAME, latest_spx_prediction
 from django.core.management import call_command
-from django.http import StreamingHttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+import base64
+import json
 import threading
 
 
@@ -19,13 +34,35 @@ class DashboardView(TemplateView):
     template_name = "core/dashboard.html"
 
 
+def _latest_feature_version():
+    return FeatureFrame.objects.order_by("-date").values_list("date", "updated_at").first()
+
+
+def _spx_direction_validator(request):
+    ff = _latest_feature_version()
+    artifact = (
+        ModelArtifact.objects
+        .filter(name=SPX_MODEL_NAME)
+        .order_by("-id")
+        .values_list("id", "created_at")
+        .first()
+    )
+    return (
+        make_etag("spx-direction", ff, artifact),
+        latest(ff and ff[1], artifact and artifact[1]),
+    )
+
+
 class SPXDirectionView(APIView):
     """
     API endpoint that returns the latest SPX direction prediction.
+    Served from the Prediction stored by update_marketpulse when there is
+    one for the latest features and model, otherwise scored live.
     """
+    @conditional(_spx_direction_validator)
     def get(self, request, *args, **kwargs):
         try:
-            result = predict_latest_spx_direction()
+            result = latest_spx_prediction()
             return Response(result)
         except RuntimeError as e:
             # Model not trained yet or other runtime error
@@ -35,11 +72,153 @@ class SPXDirectionView(APIView):
             )
 
 
+# Default and largest page /api/predictions/ will return.
+PREDICTIONS_PAGE_SIZE = 500
+PREDICTIONS_MAX_PAGE_SIZE = 2000
+
+PREDICTION_PARAMS = {"model", "start", "end", "limit", "cursor", "format"}
+
+
+def encode_prediction_cursor(day: date) -> str:
+    """Opaque cursor pointing just past `day`."""
+    return base64.urlsafe_b64encode(day.isoformat().encode()).decode().rstrip("=")
+
+
+def decode_prediction_cursor(cursor: str) -> date:
+    """The date from `encode_prediction_cursor`; ValueError if malformed."""
+    try:
+        return date.fromisoformat(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid 'cursor' value '{cursor}'")
+
+
+class PredictionListView(APIView):
+    """
+    Stored predictions by date.
+    Example: /api/predictions/?start=2024-01-01&end=2024-06-30
+
+    Optional parameters:
+    - model: artifact id for that artifact's predictions, or a model name
+      for, per date, the prediction of the newest artifact that scored it
+      (default: spx_direction_logreg)
+    - start / end: only return predictions in this date range (inclusive)
+    - limit: page size (default PREDICTIONS_PAGE_SIZE, at most
+      PREDICTIONS_MAX_PAGE_SIZE)
+    - cursor: the `next_cursor` of the previous page
+
+    Pages are keyset-paginated on date, oldest first. Any other parameter
+    is rejected with 400.
+    """
+    def get(self, request, *args, **kwargs):
+        unknown = sorted(set(request.query_params) - PREDICTION_PARAMS)
+        if unknown:
+            return Response({"error": f"Unsupported parameter(s): {', '.join(unknown)}"}, status=400)
+        try:
+            range_params = _parse_range_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        raw_limit = request.query_params.get("limit")
+        try:
+            limit = int(raw_limit) if raw_limit else PREDICTIONS_PAGE_SIZE
+        except ValueError:
+            return Response({"error": f"Invalid 'limit' value '{raw_limit}'"}, status=400)
+        if not 1 <= limit <= PREDICTIONS_MAX_PAGE_SIZE:
+            return Response({"error": f"'limit' must be between 1 and {PREDICTIONS_MAX_PAGE_SIZE}"}, status=400)
+
+        after = None
+        if request.query_params.get("cursor"):
+            try:
+                after = decode_prediction_cursor(request.query_params["cursor"])
+            except ValueError as e:
+                return Response({"error": str(e)}, status=400)
+
+        model = request.query_params.get("model") or SPX_MODEL_NAME
+        artifacts = ModelArtifact.objects.values("id", "name", "created_at")
+        if model.isdigit():
+            artifact = artifacts.filter(id=int(model)).first()
+            qs = Prediction.objects.filter(model_id=int(model))
+        else:
+            artifact = artifacts.filter(name=model).order_by("-id").first()
+            # Each artifact stores only the dates it changed (see ml.predict_spx.store_predictions)
+            newest = (
+                Prediction.objects
+                .filter(model__name=model, date=OuterRef("date"))
+                .order_by("-model_id")
+                .values("model_id")[:1]
+            )
+            qs = Prediction.objects.filter(model__name=model, model_id=Subquery(newest))
+        if artifact is None:
+            return Response({"error": f"Unknown model '{model}'"}, status=404)
+
+        if range_params["start"] is not None:
+            qs = qs.filter(date__gte=range_params["start"])
+        if range_params["end"] is not None:
+            qs = qs.filter(date__lte=range_params["end"])
+        if after is not None:
+            qs = qs.filter(date__gt=after)
+
+        # One extra row tells us whether there is a next page
+        rows = list(qs.order_by("date").values_list("date", "yhat", "details__label", "model_id")[:limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_prediction_cursor(rows[-1][0])
+        data = [
+            {"date": d, "prob_up": yhat, "label": label, "model_id": model_id}
+            for d, yhat, label, model_id in rows
+        ]
+        return Response({"model": artifact, "count": len(data), "data": data, "next_cursor": next_cursor})
+
+
+def _parse_range_params(query_params) -> dict:
+    """
+    Optional `start` / `end` (YYYY-MM-DD, inclusive) and `max_points`
+    (>= 3) query parameters. Raises ValueError with a client-facing message.
+    """
+    params = {"start": None, "end": None, "max_points": None}
+    for key in ("start", "end"):
+        raw = query_params.get(key)
+        if raw:
+            try:
+                params[key] = date.fromisoformat(raw)
+            except ValueError:
+                raise ValueError(f"Invalid '{key}' date '{raw}', expected YYYY-MM-DD")
+    raw = query_params.get("max_points")
+    if raw:
+        try:
+            params["max_points"] = int(raw)
+        except ValueError:
+            raise ValueError(f"Invalid 'max_points' value '{raw}'")
+        if params["max_points"] < 3:
+            raise ValueError("'max_points' must be at least 3")
+    return params
+
+
 class TimeSeriesView(APIView):
     """
     Generic API endpoint to return a time series for a given Series.code.
     Example: /api/timeseries/?code=CPI or /api/timeseries/?code=SPX_CLOSE
+
+    Optional parameters:
+    - start / end: only return observations in this date range (inclusive)
+    - max_points: downsample to at most this many points with LTTB
+      (e.g. ?code=SPX_CLOSE&max_points=1000 for a chart)
+
+    - layout: "rows" (default, a list of {"date", "value"} objects),
+      "columnar" (start date + day deltas + values arrays) or "binary"
+      (little-endian int32 days / float32 values, see core.wire). Also
+      negotiable via the Accept header.
+
+    - stream=1: write the rows layout incrementally while iterating the
+      query in chunks, for very large series and exports (not cached,
+      no max_points)
+
+    Rendered responses are cached per (series, generation, range,
+    max_points, layout), so repeat requests cost one small Series lookup
+    until the ETL writes new data for the series.
     """
+    renderer_classes = wire.SERIES_RENDERERS
 
     def get(self, request, *args, **kwargs):
         # 1) Read the `code` query parameter from the URL
@@ -52,87 +231,296 @@ class TimeSeriesView(APIView):
                 status=400,
             )
 
-        # 2) Look up the corresponding Series in the database
         try:
-            series = Series.objects.get(code=code)
-        except Series.DoesNotExist:
+            range_params = _parse_range_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        layout = wire.negotiate_layout(request)
+        if layout not in wire.LAYOUTS:
+            return Response(
+                {"error": f"'layout' must be one of: {', '.join(wire.LAYOUTS)}"},
+                status=400,
+            )
+
+        stream = request.query_params.get("stream", "").lower() in ("1", "true", "yes")
+        if stream and (layout != wire.ROWS or range_params["max_points"] is not None):
+            return Response(
+                {"error": "'stream' only supports the rows layout without 'max_points'"},
+                status=400,
+            )
+
+        # 2) Look up the corresponding Series (and its data generation)
+        series = (
+            Series.objects
+            .filter(code=code)
+            .values("id", "code", "name", "generation", "updated_at")
+            .first()
+        )
+        if series is None:
             return Response(
                 {"error": f"Unknown series code '{code}'"},
                 status=404,
             )
 
-        # 3) Fetch all Observations for this series, ordered by date
-        qs = Observation.objects.filter(series=series).order_by("date")
+        # 3) Conditional GET: the generation is the validator
+        version = [(series["id"], series["generation"])]
+        params = {key: str(value) for key, value in range_params.items()}
+        params["layout"] = layout
+        etag = make_etag("timeseries", version, sorted(params.items()))
+        not_modified = not_modified_response(request, etag, series["updated_at"])
+        if not_modified is not None:
+            return not_modified
+
+        if stream:
+            response = StreamingHttpResponse(
+                _stream_timeseries(series, range_params["start"], range_params["end"]),
+                content_type="application/json",
+            )
+            return set_validators(response, etag, series["updated_at"])
 
-        # 4) Build a list of {date, value} dicts for the response
-        data = [
-            {"date": obs.date, "value": obs.value}
-            for obs in qs
-        ]
+        # 4) Serve the cached body for this generation, or build it
+        key = make_cache_key("timeseries", version, params)
+        if layout == wire.BINARY:
+            body = cached_body(key, lambda: _build_timeseries_binary(series, **range_params), render=bytes)
+            response = HttpResponse(body, content_type=wire.BINARY_MEDIA_TYPE)
+        else:
+            body = cached_body(key, lambda: _build_timeseries_payload(series, layout=layout, **range_params))
+            response = json_response(body)
+        patch_vary_headers(response, ("Accept",))
+        return set_validators(response, etag, series["updated_at"])
+
+
+# Upper bound on codes per batch request.
+TIMESERIES_BATCH_MAX_CODES = 20
+
+
+class TimeSeriesBatchView(APIView):
+    """
+    Several time series in one request, fetched with a single query.
+    Example: /api/timeseries/batch/?codes=SPX_CLOSE,VIX&max_points=1000
+
+    Accepts the same start / end / max_points parameters as
+    /api/timeseries/, plus:
+    - layout=series (default): {"series": [<timeseries payload>, ...]}
+      in the requested order
+    - layout=columnar: the same, each series in the columnar layout of
+      /api/timeseries/?layout=columnar
+    - layout=frame: one date-aligned frame ({"dates": [...],
+      "columns": {code: [...]}}); add ffill=1 to forward-fill gaps
+
+    Unknown codes are listed under "missing" (404 only if none are known).
+    Cached and validated on the (id, generation) of every requested series.
+    """
+
+    def get(self, request, *args, **kwargs):
+        raw = request.query_params.get("codes", "")
+        codes = list(dict.fromkeys(c.strip() for c in raw.split(",") if c.strip()))
+        if not codes:
+            return Response(
+                {"error": "Missing 'codes' query parameter, e.g. ?codes=SPX_CLOSE,VIX"},
+                status=400,
+            )
+        if len(codes) > TIMESERIES_BATCH_MAX_CODES:
+            return Response(
+                {"error": f"At most {TIMESERIES_BATCH_MAX_CODES} codes per request"},
+                status=400,
+            )
+
+        layout = request.query_params.get("layout", "series")
+        if layout not in ("series", wire.COLUMNAR, "frame"):
+            return Response({"error": "'layout' must be 'series', 'columnar' or 'frame'"}, status=400)
+        ffill = request.query_params.get("ffill", "").lower() in ("1", "true", "yes")
+
+        try:
+            range_params = _parse_range_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
 
-        # 5) Wrap everything in a structured JSON response
-        result = {
-            "code": series.code,
-            # Use name if you have it; otherwise fall back to code
-            "name": getattr(series, "name", series.code),
-            "count": len(data),
-            "data": data,
+        by_code = {
+            s["code"]: s
+            for s in Series.objects.filter(code__in=codes).values("id", "code", "name", "generation", "updated_at")
         }
-        return Response(result)
+        series_list = [by_code[code] for code in codes if code in by_code]
+        missing = [code for code in codes if code not in by_code]
+        if not series_list:
+            return Response(
+                {"error": f"Unknown series code(s): {', '.join(missing)}"},
+                status=404,
+            )
 
-def _get_series(code: str) -> Series:
-    return Series.objects.get(code=code)
+        version = [(s["id"], s["generation"]) for s in series_list]
+        params = {key: str(value) for key, value in range_params.items()}
+        params.update(layout=layout, ffill=str(ffill))
+        etag = make_etag("timeseries-batch", version, missing, sorted(params.items()))
+        last_modified = latest(*(s["updated_at"] for s in series_list))
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        def build():
+            if layout == "frame":
+                payload = _build_frame_payload(series_list, ffill=ffill, **range_params)
+            else:
+                rows = _observation_rows([s["id"] for s in series_list], range_params["start"], range_params["end"])
+                payload = {
+                    "series": [
+                        _series_payload(
+                            s,
+                            rows[s["id"]],
+                            range_params["max_points"],
+                            wire.COLUMNAR if layout == wire.COLUMNAR else wire.ROWS,
+                        )
+                        for s in series_list
+                    ],
+                }
+            payload["missing"] = missing
+            return payload
+
+        key = make_cache_key("timeseries-batch", [version, missing], params)
+        body = cached_body(key, build)
+        return set_validators(json_response(body), etag, last_modified)
 
 
-def _get_observation_on_or_before(code: str, target_date):
+def _observation_rows(series_ids, start=None, end=None):
     """
-    Return the latest Observation for `code` on or before `target_date`,
-    or None if nothing exists.
+    One query for the Observations of all `series_ids` (optionally within
+    a date range), as {series_id: [(date, value), ...]} ordered by date.
     """
-    series = _get_series(code)
-    return (
-        Observation.objects
-        .filter(series=series, date__lte=target_date)
-        .order_by("-date")
-        .first()
-    )
+    qs = Observation.objects.filter(series__in=series_ids)
+    if start is not None:
+        qs = qs.filter(date__gte=start)
+    if end is not None:
+        qs = qs.filter(date__lte=end)
+    rows = {series_id: [] for series_id in series_ids}
+    for series_id, d, value in qs.order_by("series_id", "date").values_list("series_id", "date", "value"):
+        rows[series_id].append((d, value))
+    return rows
+
+
+def _downsample_indices(rows, max_points):
+    """Indices LTTB keeps over (day number, value), or None to keep all."""
+    if max_points is None or len(rows) <= max_points:
+        return None
+    x = np.array([d.toordinal() for d, _ in rows], dtype=float)
+    y = np.array([v for _, v in rows], dtype=float)
+    return lttb_indices(x, y, max_points)
+
+
+def _downsample(rows, max_points):
+    kept = _downsample_indices(rows, max_points)
+    if kept is None:
+        return rows
+    return [rows[i] for i in kept]
+
+
+def _series_payload(series: dict, rows, max_points=None, layout=wire.ROWS) -> dict:
+    total = len(rows)
+    rows = _downsample(rows, max_points)
+
+    # Wrap everything in a structured JSON response
+    payload = {
+        "code": series["code"],
+        # Use name if you have it; otherwise fall back to code
+        "name": series["name"] or series["code"],
+        "count": len(rows),
+        "total": total,
+    }
+    if layout == wire.COLUMNAR:
+        payload["layout"] = wire.COLUMNAR
+        payload.update(wire.encode_columnar(rows))
+    else:
+        payload["data"] = [{"date": d, "value": v} for d, v in rows]
+    return payload
 
 
-def _compute_cpi_yoy(feature_date):
+def _build_timeseries_payload(series: dict, start=None, end=None, max_points=None, layout=wire.ROWS) -> dict:
+    rows = _observation_rows([series["id"]], start, end)[series["id"]]
+    return _series_payload(series, rows, max_points, layout)
+
+
+# Rows fetched per database round trip (and per written chunk) when streaming.
+TIMESERIES_STREAM_CHUNK_SIZE = 5000
+
+
+def _stream_timeseries(series: dict, start=None, end=None):
+    qs = Observation.objects.filter(series_id=series["id"])
+    if start is not None:
+        qs = qs.filter(date__gte=start)
+    if end is not None:
+        qs = qs.filter(date__lte=end)
+    rows = qs.order_by("date").values_list("date", "value").iterator(chunk_size=TIMESERIES_STREAM_CHUNK_SIZE)
+    header = {"code": series["code"], "name": series["name"] or series["code"]}
+    return wire.stream_rows_json(header, rows, TIMESERIES_STREAM_CHUNK_SIZE)
+
+
+def _build_timeseries_binary(series: dict, start=None, end=None, max_points=None) -> bytes:
+    rows = _observation_rows([series["id"]], start, end)[series["id"]]
+    return wire.encode_binary(_downsample(rows, max_points), len(rows))
+
+
+def _build_frame_payload(series_list, start=None, end=None, max_points=None, ffill=False) -> dict:
     """
-    Compute CPI year-over-year % using Observations:
-    (CPI_today / CPI_1year_ago - 1) * 100
+    Date-aligned frame: one `dates` column (union of all series' dates)
+    and one value column per code, None where a series has no value.
+    With `ffill`, gaps take the series' last known value instead.
+
+    `max_points` downsamples each series with LTTB and keeps the union of
+    the selected dates, so every series keeps its own peaks and troughs.
     """
-    obs_now = _get_observation_on_or_before("CPI", feature_date)
-    obs_year_ago = _get_observation_on_or_before("CPI", feature_date - timedelta(days=365))
+    rows = _observation_rows([s["id"] for s in series_list], start, end)
+
+    kept_dates = set()
+    for s in series_list:
+        series_rows = rows[s["id"]]
+        kept = _downsample_indices(series_rows, max_points)
+        if kept is None:
+            kept_dates.update(d for d, _ in series_rows)
+        else:
+            kept_dates.update(series_rows[i][0] for i in kept)
+    dates = np.array(sorted(kept_dates), dtype="datetime64[D]")
+
+    columns = {}
+    for s in series_list:
+        series_rows = rows[s["id"]]
+        values = np.full(len(dates), np.nan)
+        if series_rows:
+            own_dates = np.array([d for d, _ in series_rows], dtype="datetime64[D]")
+            own_values = np.array([v for _, v in series_rows], dtype=float)
+            idx = np.searchsorted(own_dates, dates, side="right") - 1
+            found = idx >= 0
+            if not ffill:
+                found &= own_dates[np.maximum(idx, 0)] == dates
+            values[found] = own_values[idx[found]]
+        columns[s["code"]] = [None if np.isnan(v) else float(v) for v in values]
+
+    return {
+        "codes": [s["code"] for s in series_list],
+        "names": {s["code"]: s["name"] or s["code"] for s in series_list},
+        "count": len(dates),
+        "dates": [d.isoformat() for d in dates.astype(object)],
+        "columns": columns,
+    }
 
-    if not obs_now or not obs_year_ago or obs_year_ago.value == 0:
-        return None
 
-    return (obs_now.value / obs_year_ago.value - 1.0) * 100.0
+def _compute_cpi_yoy(feature_date):
+    """
+    CPI year-over-year % at `feature_date`:
+    (CPI_today / CPI_12_months_earlier - 1) * 100
+
+    Read from the derived CPI_YOY series (see etl.derived).
+    """
+    return series_index.value_on_or_before("CPI_YOY", feature_date)
 
 
 def _compute_spx_drawdown(feature_date):
     """
-    Compute drawdown at `feature_date`:
-    (SPX_today - peak_so_far) / peak_so_far
+    Drawdown at `feature_date`: (SPX_today - peak_so_far) / peak_so_far.
     Negative -> below peak; 0 -> at peak.
-    """
-    series = _get_series("SPX_CLOSE")
-    qs = Observation.objects.filter(series=series, date__lte=feature_date).order_by("date")
-    if not qs.exists():
-        return None
 
-    peak = float("-inf")
-    drawdown = None
-    for obs in qs:
-        if obs.value > peak:
-            peak = obs.value
-        dd = (obs.value - peak) / peak if peak != 0 else 0.0
-        if obs.date == feature_date:
-            drawdown = dd
-
-    return drawdown
+    Read from the derived SPX_DRAWDOWN series (see etl.derived).
+    """
+    return series_index.value_on_or_before("SPX_DRAWDOWN", feature_date)
 
 
 def _compute_macro_heat_index(snapshot: dict):
@@ -210,99 +598,262 @@ def _compute_risk_barometer(snapshot: dict):
     return score, label
 
 
+def _macro_snapshot_validator(request):
+    ff = _latest_feature_version()
+    derived = sorted(
+        Series.objects
+        .filter(code__in=["CPI_YOY", "SPX_DRAWDOWN"])
+        .values_list("code", "generation", "updated_at")
+    )
+    return (
+        make_etag("macro-snapshot", ff, [(code, gen) for code, gen, _ in derived]),
+        latest(ff and ff[1], *[ts for _, _, ts in derived]),
+    )
+
+
 class MacroSnapshotView(APIView):
     """
     Returns a one-row snapshot for the dashboard macro card.
     Pulls raw levels from FeatureFrame, then computes:
-    - CPI YoY from Observations
-    - SPX drawdown from Observations
+    - CPI YoY from the derived CPI_YOY series
+    - SPX drawdown from the derived SPX_DRAWDOWN series
     - Macro Heat Index
     - Risk Barometer
     """
+    @conditional(_macro_snapshot_validator)
     def get(self, request, *args, **kwargs):
-        ff = FeatureFrame.objects.order_by("-date").first()
-        if not ff:
+        snapshot = build_macro_snapshot()
+        if snapshot is None:
             return Response({"detail": "No FeatureFrame data available."}, status=503)
+        return Response(snapshot)
 
-        feats = ff.features or {}
-
-        # Base values from FeatureFrame
-        cpi_level = feats.get("cpi_level")
-        unemp_rate = feats.get("unrate")
-        us10y = feats.get("us10y")
-        us2y = feats.get("us2y")
-        term_spread = feats.get("term_spread_10y_2y")
-        vix = feats.get("vix_close")
-        spx_close = feats.get("spx_close")
-
-        # Derived metrics from Observations
-        cpi_yoy = _compute_cpi_yoy(ff.date)
-        spx_drawdown = _compute_spx_drawdown(ff.date)
-
-        snapshot = {
-            "as_of": ff.date.isoformat(),
-            "cpi_yoy": cpi_yoy,
-            "cpi_level": cpi_level,
-            "unemp_rate": unemp_rate,
-            "us10y": us10y,
-            "us2y": us2y,
-            "term_spread_10y_2y": term_spread,
-            "vix": vix,
-            "spx_close": spx_close,
-            "spx_drawdown": spx_drawdown,
-            "regime_label": feats.get("regime_label"),  # optional, may be None
-        }
 
-        # Composite indices
-        heat_score, heat_label = _compute_macro_heat_index(snapshot)
-        risk_score, risk_label = _compute_risk_barometer(snapshot)
+def build_macro_snapshot():
+    """
+    Snapshot dict for the latest FeatureFrame, or None if there is none.
+    Shared by MacroSnapshotView and the dashboard bundle.
+    """
+    ff = FeatureFrame.objects.order_by("-date").first()
+    if not ff:
+        return None
 
-        snapshot["macro_heat_index"] = heat_score
-        snapshot["macro_heat_label"] = heat_label
-        snapshot["risk_barometer_score"] = risk_score
-        snapshot["risk_barometer_label"] = risk_label
+    feats = ff.features or {}
+
+    # Base values from FeatureFrame
+    cpi_level = feats.get("cpi_level")
+    unemp_rate = feats.get("unrate")
+    us10y = feats.get("us10y")
+    us2y = feats.get("us2y")
+    term_spread = feats.get("term_spread_10y_2y")
+    vix = feats.get("vix_close")
+    spx_close = feats.get("spx_close")
+
+    # Derived metrics from Observations
+    cpi_yoy = _compute_cpi_yoy(ff.date)
+    spx_drawdown = _compute_spx_drawdown(ff.date)
+
+    snapshot = {
+        "as_of": ff.date.isoformat(),
+        "cpi_yoy": cpi_yoy,
+        "cpi_level": cpi_level,
+        "unemp_rate": unemp_rate,
+        "us10y": us10y,
+        "us2y": us2y,
+        "term_spread_10y_2y": term_spread,
+        "vix": vix,
+        "spx_close": spx_close,
+        "spx_drawdown": spx_drawdown,
+        "regime_label": feats.get("regime_label"),  # optional, may be None
+    }
+
+    # Composite indices
+    heat_score, heat_label = _compute_macro_heat_index(snapshot)
+    risk_score, risk_label = _compute_risk_barometer(snapshot)
+
+    snapshot["macro_heat_index"] = heat_score
+    snapshot["macro_heat_label"] = heat_label
+    snapshot["risk_barometer_score"] = risk_score
+    snapshot["risk_barometer_label"] = risk_label
+
+    return snapshot
+
+def _news_validator(request):
+    # Both aggregates are answered from indexes (pk, updated_at).
+    versions = NewsArticle.objects.aggregate(last_id=Max("id"), last_updated=Max("updated_at"))
+    return (
+        make_etag("news", versions["last_id"], versions["last_updated"], sorted(request.GET.items())),
+        versions["last_updated"],
+    )
+
+
+# Largest page /api/news/ will return.
+NEWS_MAX_PAGE_SIZE = 100
+
+
+def encode_news_cursor(published_at: datetime, article_id: int) -> str:
+    """Opaque cursor pointing just past (published_at, id)."""
+    raw = f"{published_at.isoformat()}|{article_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_news_cursor(cursor: str):
+    """(published_at, id) from `encode_news_cursor`; ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        published_at, article_id = raw.split("|")
+        return datetime.fromisoformat(published_at), int(article_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid 'cursor' value '{cursor}'")
 
-        return Response(snapshot)
 
 class NewsListView(APIView):
     """
     Simple API endpoint that returns the latest news articles
     (with sentiment, summary, topics) for the dashboard.
+
+    Optional parameters:
+    - limit: page size (default 20, at most NEWS_MAX_PAGE_SIZE)
+    - cursor: the `next_cursor` of the previous page
+    - source, sentiment_label: exact filters (indexed)
+    - topic: substring of the comma-separated topics
+    - ticker: articles tagged with this ticker
+
+    Pages are keyset-paginated on (published_at, id), newest first, so
+    every page costs the same however far back it is; there is no total
+    count.
     """
+    @conditional(_news_validator)
     def get(self, request, *args, **kwargs):
         # 1) Read ?limit= from the query string, default to 20 if missing
         try:
             limit = int(request.GET.get("limit", 20))
         except ValueError:
             limit = 20
+        limit = max(1, min(limit, NEWS_MAX_PAGE_SIZE))
 
-        # 2) Query the latest news articles by published_at
-        qs = NewsArticle.objects.order_by("-published_at")[:limit]
-
-        # 3) Build a list of plain dicts that can be serialized as JSON
-        articles_data = []
-        for art in qs:
-            articles_data.append(
-                {
-                    "source": art.source,
-                    "title": art.title,
-                    "url": art.url,
-                    "published_at": art.published_at.isoformat(),
-                    "summary": art.summary,
-                    "sentiment_label": art.sentiment_label,
-                    "sentiment_score": art.sentiment_score,
-                    "topics": art.topics,
-                }
-            )
+        cursor = None
+        if request.GET.get("cursor"):
+            try:
+                cursor = decode_news_cursor(request.GET["cursor"])
+            except ValueError as e:
+                return Response({"error": str(e)}, status=400)
+
+        filters = {
+            key: request.GET[key]
+            for key in ("source", "sentiment_label", "topic", "ticker")
+            if request.GET.get(key)
+        }
+        return Response(build_news_payload(limit, cursor, filters))
 
-        # 4) Wrap it in a top-level object and return as JSON
-        return Response(
+
+def build_news_payload(limit: int = 20, cursor=None, filters: Optional[Dict[str, str]] = None) -> dict:
+    """
+    One page of articles, newest first, as plain dicts that can be
+    serialized as JSON, plus the cursor of the next page (None on the
+    last one). Shared by NewsListView and the dashboard bundle.
+    """
+    filters = filters or {}
+    qs = NewsArticle.objects.all()
+    if "source" in filters:
+        qs = qs.filter(source=filters["source"])
+    if "sentiment_label" in filters:
+        qs = qs.filter(sentiment_label=filters["sentiment_label"].upper())
+    if "topic" in filters:
+        qs = qs.filter(topics__icontains=filters["topic"])
+    if "ticker" in filters:
+        ticker = filters["ticker"].upper()
+        if connection.features.supports_json_field_contains:
+            qs = qs.filter(tickers__contains=[ticker])
+        else:
+            # e.g. SQLite: match the quoted ticker in the stored JSON text
+            qs = qs.filter(tickers__icontains=json.dumps(ticker))
+    if cursor is not None:
+        published_at, article_id = cursor
+        qs = qs.filter(Q(published_at__lt=published_at) | Q(published_at=published_at, id__lt=article_id))
+
+    # One extra row tells us whether there is a next page
+    page = list(qs.order_by("-published_at", "-id")[:limit + 1])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_news_cursor(page[-1].published_at, page[-1].id)
+
+    articles_data = []
+    for art in page:
+        articles_data.append(
             {
-                "count": qs.count(),
-                "articles": articles_data,
+                "id": art.id,
+                "source": art.source,
+                "title": art.title,
+                "url": art.url,
+                "published_at": art.published_at.isoformat(),
+                "summary": art.summary,
+                "sentiment_label": art.sentiment_label,
+                "sentiment_score": art.sentiment_score,
+                "topics": art.topics,
+                "tickers": art.tickers,
             }
         )
 
+    # Wrap it in a top-level object
+    return {
+        "count": len(articles_data),
+        "articles": articles_data,
+        "next_cursor": next_cursor,
+    }
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip: listed with a non-zero
+    q-value, or covered by a non-zero "*" when gzip isn't listed itself.
+    """
+    qvalues = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding] = q
+    if "gzip" in qvalues:
+        return qvalues["gzip"] > 0
+    return qvalues.get("*", 0) > 0
+
+
+class DashboardBundleView(APIView):
+    """
+    Everything the dashboard shows in one response: the latest
+    DashboardBundle built by update_marketpulse, served from memory.
+    Sent gzip-encoded as stored when the client accepts it.
+    """
+    def get(self, request, *args, **kwargs):
+        bundle = bundle_cache.get()
+        if bundle is None:
+            return Response(
+                {"detail": "No dashboard bundle yet. Please run /api/update/ first."},
+                status=503,
+            )
+
+        not_modified = not_modified_response(request, bundle.etag, bundle.created_at)
+        if not_modified is not None:
+            return not_modified
+
+        if _accepts_gzip(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+            response = HttpResponse(bundle.gzipped, content_type="application/json")
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = json_response(bundle.body)
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return set_validators(response, bundle.etag, bundle.created_at)
+
 
 class StatusView(APIView):
     """
@@ -0,0 +1,155 @@
+"""
+Compact wire formats for time series.
+
+The default "rows" layout repeats {"date": ..., "value": ...} for every
+point. Two denser layouts are available, chosen with ?layout= or the
+Accept header:
+
+- columnar (JSON): the first date, the day gaps between consecutive
+  points and a parallel array of values, e.g.
+  {"start": "2024-01-02", "deltas": [0, 1, 3], "values": [1.0, 2.0, 3.0]}
+
+- binary (application/octet-stream), little-endian:
+    header          4s "MPTS", uint16 version, uint16 reserved,
+                    uint32 count, uint32 total            (16 bytes)
+    int32[count]    days since 1970-01-01
+    float32[count]  values
+  Both arrays start on 4-byte boundaries, so browsers can view them
+  directly with Int32Array / Float32Array.
+"""
+
+import json
+import struct
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+ROWS = "rows"
+COLUMNAR = "columnar"
+BINARY = "binary"
+LAYOUTS = (ROWS, COLUMNAR, BINARY)
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.marketpulse.columnar+json"
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+BINARY_MAGIC = b"MPTS"
+BINARY_VERSION = 1
+_HEADER = struct.Struct("<4sHHII")
+
+EPOCH = date(1970, 1, 1)
+
+Rows = Sequence[Tuple[date, float]]
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """Lets clients ask for the columnar layout with an Accept header."""
+    media_type = COLUMNAR_MEDIA_TYPE
+    format = COLUMNAR
+
+
+class BinarySeriesRenderer(BaseRenderer):
+    """Lets clients ask for the binary layout with an Accept header."""
+    media_type = BINARY_MEDIA_TYPE
+    format = BINARY
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        # Error responses stay JSON
+        return JSONRenderer().render(data)
+
+
+SERIES_RENDERERS = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer, BinarySeriesRenderer]
+
+
+def negotiate_layout(request) -> str:
+    """
+    Layout requested by ?layout=, else by the Accept header (through the
+    renderer DRF negotiated), else "rows". An unknown ?layout= value is
+    returned as is for the caller to reject.
+    """
+    layout = request.query_params.get("layout")
+    if layout:
+        return layout
+    renderer = getattr(request, "accepted_renderer", None)
+    if renderer is not None and renderer.format in (COLUMNAR, BINARY):
+        return renderer.format
+    return ROWS
+
+
+def _ordinals(rows: Rows) -> np.ndarray:
+    return np.fromiter((d.toordinal() for d, _ in rows), dtype=np.int64, count=len(rows))
+
+
+def _values(rows: Rows, dtype) -> np.ndarray:
+    return np.fromiter((v for _, v in rows), dtype=dtype, count=len(rows))
+
+
+def encode_columnar(rows: Rows) -> dict:
+    """{"start", "deltas", "values"} for date-ordered (date, value) rows."""
+    if not rows:
+        return {"start": None, "deltas": [], "values": []}
+    ordinals = _ordinals(rows)
+    return {
+        "start": rows[0][0].isoformat(),
+        "deltas": np.diff(ordinals, prepend=ordinals[0]).tolist(),
+        "values": _values(rows, float).tolist(),
+    }
+
+
+def decode_columnar(payload: dict) -> List[Tuple[date, float]]:
+    if not payload["start"]:
+        return []
+    day = date.fromisoformat(payload["start"])
+    rows = []
+    for delta, value in zip(payload["deltas"], payload["values"]):
+        day += timedelta(days=delta)
+        rows.append((day, value))
+    return rows
+
+
+def encode_binary(rows: Rows, total: int) -> bytes:
+    """Binary layout (see module docstring); `total` is the pre-downsampling count."""
+    days = (_ordinals(rows) - EPOCH.toordinal()).astype("<i4")
+    values = _values(rows, "<f4")
+    header = _HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, len(rows), total)
+    return header + days.tobytes() + values.tobytes()
+
+
+def decode_binary(data: bytes) -> Tuple[np.ndarray, np.ndarray, int]:
+    """(dates as datetime64[D], float32 values, total) from `encode_binary` output."""
+    magic, version, _, count, total = _HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError("Not a MarketPulse binary series")
+    offset = _HEADER.size
+    days = np.frombuffer(data, dtype="<i4", count=count, offset=offset)
+    values = np.frombuffer(data, dtype="<f4", count=count, offset=offset + 4 * count)
+    return days.astype("datetime64[D]"), values, total
+
+
+def stream_rows_json(header: dict, rows: Iterable[Tuple[date, float]], chunk_size: int) -> Iterator[bytes]:
+    """
+    Rows layout written incrementally: `header`'s fields, then "data" in
+    pieces of `chunk_size` points, then "count" / "total" once known.
+    Memory stays flat however many rows `rows` yields.
+    """
+    head = json.dumps(header)
+    yield (head[:-1] + (", " if header else "") + '"data": [').encode()
+
+    count = 0
+    buf = []
+    for d, v in rows:
+        buf.append('{"date": "%s", "value": %s}' % (d.isoformat(), json.dumps(v)))
+        if len(buf) >= chunk_size:
+            yield (", " if count else "").encode() + ", ".join(buf).encode()
+            count += len(buf)
+            buf = []
+    if buf:
+        yield (", " if count else "").encode() + ", ".join(buf).encode()
+        count += len(buf)
+
+    yield ('], "count": %d, "total": %d}' % (count, count)).encode()
@@ -0,0 +1,173 @@
+"""
+Derived series stored as first-class Series.
+
+Values such as CPI YoY, the 10Y-2Y term spread or the SPX drawdown are
+declared once in DERIVED_SERIES, computed vectorized from their inputs
+after ingestion, and stored as Series(source="DERIVED") with ordinary
+Observations. They are then served by /api/timeseries/ and the
+SeriesIndex like any other series.
+
+Each run only recomputes outputs from the earliest changed input date;
+the diff-based upsert then writes just the rows that actually moved.
+"""
+
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.models import Observation
+from core.series_index import series_index
+from etl.ingest import get_or_create_series, upsert_observations, format_stats
+
+# output code -> (dates as datetime64[D], values)
+Outputs = Dict[str, Tuple[np.ndarray, np.ndarray]]
+
+
+class DerivedSeries:
+    """
+    One registry entry: `compute(start)` returns arrays for every output
+    code, covering at least all dates >= `start` (everything if None).
+    """
+
+    def __init__(
+        self,
+        outputs: Dict[str, str],
+        inputs: List[str],
+        compute: Callable[[Optional[date]], Outputs],
+        freq: str = "D",
+    ):
+        self.outputs = outputs  # code -> human-readable name
+        self.inputs = inputs
+        self.compute = compute
+        self.freq = freq
+
+    def __repr__(self):
+        return f"DerivedSeries({', '.join(self.outputs)} <- {', '.join(self.inputs)})"
+
+
+def _arrays(code: str) -> Tuple[np.ndarray, np.ndarray]:
+    arrays = series_index.arrays(code)
+    if arrays is None:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype=float)
+    return arrays
+
+
+def pct_change(code: str, name: str, source: str, periods: int, scale: float = 100.0, freq: str = "M") -> DerivedSeries:
+    """(x_t / x_{t-periods} - 1) * scale, on the source's own dates."""
+    def compute(start: Optional[date]) -> Outputs:
+        dates, values = _arrays(source)
+        if len(values) <= periods:
+            return {code: (dates[:0], values[:0])}
+        prev = values[:-periods]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = np.where(prev != 0, (values[periods:] / prev - 1.0) * scale, np.nan)
+        return {code: (dates[periods:], out)}
+
+    return DerivedSeries({code: name}, [source], compute, freq=freq)
+
+
+def diff(code: str, name: str, left: str, right: str, freq: str = "D") -> DerivedSeries:
+    """left - right, as-of aligned on the union of both series' dates."""
+    def compute(start: Optional[date]) -> Outputs:
+        dates = np.union1d(_arrays(left)[0], _arrays(right)[0])
+        out = series_index.values_on_or_before(left, dates) - series_index.values_on_or_before(right, dates)
+        return {code: (dates, out)}
+
+    return DerivedSeries({code: name}, [left, right], compute, freq=freq)
+
+
+def drawdown(code: str, name: str, source: str, peak_code: str, peak_name: str, freq: str = "D") -> DerivedSeries:
+    """
+    Running peak (cumulative max) and (x - peak) / peak of `source`.
+
+    Incremental runs seed the cumulative max with the stored peak of the
+    last bar before `start` instead of rescanning the whole history.
+    """
+    def compute(start: Optional[date]) -> Outputs:
+        dates, values = _arrays(source)
+        seed = None
+        if start is not None:
+            first = np.searchsorted(dates, np.datetime64(start, "D"))
+            if first > 0:
+                seed = (
+                    Observation.objects
+                    .filter(series__code=peak_code, date=dates[first - 1].astype(object))
+                    .values_list("value", flat=True)
+                    .first()
+                )
+            if seed is not None:
+                dates, values = dates[first:], values[first:]
+        if seed is not None:
+            peaks = np.maximum.accumulate(np.concatenate([[seed], values]))[1:]
+        else:
+            # First run, or the stored peak has a hole: full history
+            peaks = np.maximum.accumulate(values)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdowns = np.where(peaks != 0, (values - peaks) / peaks, 0.0)
+        return {peak_code: (dates, peaks), code: (dates, drawdowns)}
+
+    return DerivedSeries({peak_code: peak_name, code: name}, [source], compute, freq=freq)
+
+
+# Order matters: a spec may use outputs of specs listed before it.
+DERIVED_SERIES: List[DerivedSeries] = [
+    pct_change("CPI_YOY", "CPI YoY %", "CPI", periods=12),
+    diff("TERM_SPREAD_10Y_2Y", "10Y-2Y Term Spread", "US10Y", "US2Y"),
+    drawdown("SPX_DRAWDOWN", "S&P 500 Drawdown", "SPX_CLOSE", peak_code="SPX_PEAK", peak_name="S&P 500 Running Peak"),
+]
+
+
+def _has_observations(code: str) -> bool:
+    return Observation.objects.filter(series__code=code).exists()
+
+
+def run_derived_etl(
+    changes: Optional[Dict[str, Dict[str, Any]]] = None,
+    full: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Recompute every registered derived series.
+
+    `changes` is the merged per-series result of the ingestion stages
+    ({code: {"first_changed": date, ...}}); a spec is recomputed from the
+    earliest changed date among its inputs and skipped if none changed.
+    Pass full=True (or changes=None) to recompute everything.
+
+    Returns per-output upsert stats, like the ingestion stages.
+    """
+    first_changed: Dict[str, date] = {}
+    if changes is not None:
+        for code, stats in changes.items():
+            if stats.get("first_changed") is not None:
+                first_changed[code] = stats["first_changed"]
+    recompute_all = full or changes is None
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for spec in DERIVED_SERIES:
+        if any(_arrays(code)[0].size == 0 for code in spec.inputs):
+            print(f"Skipping {spec}: missing input data")
+            continue
+
+        missing_output = not all(_has_observations(code) for code in spec.outputs)
+        input_changes = [first_changed[code] for code in spec.inputs if code in first_changed]
+        if recompute_all or missing_output:
+            start = None
+        elif input_changes:
+            start = min(input_changes)
+        else:
+            continue
+
+        computed = spec.compute(start)
+        for code, (dates, values) in computed.items():
+            keep = ~np.isnan(values)
+            if start is not None:
+                keep &= dates >= np.datetime64(start, "D")
+            series = get_or_create_series(code, name=spec.outputs[code], freq=spec.freq, source="DERIVED")
+            stats = upsert_observations(series, zip(dates[keep].astype(object), values[keep]))
+            results[code] = stats
+            if stats["first_changed"] is not None:
+                first_changed[code] = stats["first_changed"]
+            print(f" -> {code} (from {start or 'start of history'}): {format_stats(stats)}")
+
+    return results
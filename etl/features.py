@@ -1,27 +1,43 @@
 from datetime import date, timedelta
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
+import numpy as np
+import pandas as pd
 from django.db import transaction
 
 from core.models import Series, Observation, FeatureFrame
+from core.series_index import series_index
 
-def get_series_value_on_or_before(series_code: str, d: date) -> Optional[float]:
-    try:
-        series = Series.objects.get(code=series_code)
-    except:
-        return None
+# Rows per INSERT statement when bulk-writing FeatureFrame rows.
+FEATURE_WRITE_BATCH_SIZE = 1000
 
-    obs = (
-        Observation.objects
-        .filter(series=series, date__lte = d)
-        .order_by("-date")
-        .first()
-    )
+# Feature key -> source series code, in the order build_features_for_date
+# inserts them. Derived features (returns, spreads) are computed separately.
+LEVEL_FEATURES: Dict[str, str] = {
+    "spx_close": "SPX_CLOSE",
+    "vix_close": "VIX",
+    "spy_volume": "SPY_VOLUME",
+    "cpi_level": "CPI",
+    "unrate": "Unemployment",
+    "us10y": "US10Y",
+    "us2y": "US2Y",
+}
 
-    if obs is None:
-        return None
-    return obs.value
+FEATURE_KEYS: List[str] = [
+    "spx_close",
+    "spx_ret_1d",
+    "vix_close",
+    "spy_volume",
+    "cpi_level",
+    "unrate",
+    "us10y",
+    "us2y",
+    "term_spread_10y_2y",
+]
+
+def get_series_value_on_or_before(series_code: str, d: date) -> Optional[float]:
+    return series_index.value_on_or_before(series_code, d)
 
 def build_features_for_date(d: date) -> FeatureFrame:
     features: Dict[str, float] = {}
@@ -75,29 +91,177 @@ def build_features_for_date(d: date) -> FeatureFrame:
     )
     return ff
 
-def build_features_for_all_dates() -> None:
+def load_series_frame(series_code: str, since: Optional[date] = None) -> pd.Series:
+    """
+    Observations for `series_code` as a float pandas Series on a sorted
+    DatetimeIndex (empty if the series does not exist).
+
+    With `since`, only rows from that date onwards are loaded, plus the last
+    row before it so as-of lookups at `since` still resolve.
+    """
+    qs = Observation.objects.filter(series__code=series_code)
+    if since is not None:
+        anchor = (
+            qs.filter(date__lt=since)
+            .order_by("-date")
+            .values_list("date", flat=True)
+            .first()
+        )
+        qs = qs.filter(date__gte=anchor or since)
+    rows = list(qs.order_by("date").values_list("date", "value"))
+    if not rows:
+        return pd.Series(dtype=float)
+    dates, values = zip(*rows)
+    return pd.Series(values, index=pd.DatetimeIndex(dates), dtype=float)
+
+
+def _as_of(values: pd.Series, index: pd.DatetimeIndex) -> np.ndarray:
+    """Vectorized get_series_value_on_or_before: NaN where nothing exists yet."""
+    if values.empty:
+        return np.full(len(index), np.nan)
+    return values.reindex(index, method="ffill").to_numpy(dtype=float)
+
+
+def compute_feature_frame(start: date, end: date) -> pd.DataFrame:
+    """
+    Compute features, target and label for every calendar day in
+    [start, end] with column operations, mirroring build_features_for_date.
+
+    Each series is loaded once, from the last observation before `start`
+    onwards, and forward-filled onto the calendar index. Missing values
+    are NaN; label is a float column (NaN when undefined).
+
+    This deliberately bypasses the process-wide SeriesIndex (which holds
+    whole histories): the builder runs in the pipeline process, right
+    after the ETL changed the series, so the index would be cold and load
+    every series' full history even for a rebuild of the last few days.
+    """
+    index = pd.date_range(start, end, freq="D")
+    one_day = pd.Timedelta(days=1)
+
+    # spx_yest needs the as-of value the day before `start`.
+    since = start - timedelta(days=1)
+    frames = {code: load_series_frame(code, since) for code in set(LEVEL_FEATURES.values())}
+
+    df = pd.DataFrame(index=index)
+    for key, code in LEVEL_FEATURES.items():
+        df[key] = _as_of(frames[code], index)
+
+    spx = frames["SPX_CLOSE"]
+    spx_today = df["spx_close"].to_numpy()
+    spx_yest = _as_of(spx, index - one_day)
+    spx_tomorrow = _as_of(spx, index + one_day)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret_ok = ~np.isnan(spx_today) & ~np.isnan(spx_yest) & (spx_yest != 0)
+        df["spx_ret_1d"] = np.where(ret_ok, (spx_today - spx_yest) / spx_yest, np.nan)
+
+        target_ok = ~np.isnan(spx_today) & ~np.isnan(spx_tomorrow) & (spx_today != 0)
+        target = np.where(target_ok, (spx_tomorrow - spx_today) / spx_today, np.nan)
+
+    df["term_spread_10y_2y"] = df["us10y"] - df["us2y"]
+    df["target"] = target
+    df["label"] = np.where(np.isnan(target), np.nan, (target > 0).astype(float))
+    return df
+
+
+def _frame_to_feature_rows(df: pd.DataFrame) -> List[FeatureFrame]:
+    keys = [key for key in FEATURE_KEYS if key in df.columns]
+    values = df[keys].to_numpy()
+    targets = df["target"].to_numpy()
+    labels = df["label"].to_numpy()
+
+    rows: List[FeatureFrame] = []
+    for i, ts in enumerate(df.index):
+        features = {
+            key: float(values[i, j])
+            for j, key in enumerate(keys)
+            if not np.isnan(values[i, j])
+        }
+        target = None if np.isnan(targets[i]) else float(targets[i])
+        label = None if np.isnan(labels[i]) else int(labels[i])
+        rows.append(FeatureFrame(date=ts.date(), features=features, target=target, label=label))
+    return rows
+
+
+def write_feature_frame(df: pd.DataFrame, batch_size: int = FEATURE_WRITE_BATCH_SIZE) -> int:
+    """Upsert the rows of a computed feature frame in batches."""
+    rows = _frame_to_feature_rows(df)
+    with transaction.atomic():
+        FeatureFrame.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["date"],
+            update_fields=["features", "target", "label", "updated_at"],
+        )
+    return len(rows)
+
+
+def _spx_date_range():
+    """(first, last) SPX_CLOSE dates, or None if there is nothing to build from."""
     try:
         spx_series = Series.objects.get(code="SPX_CLOSE")
     except Series.DoesNotExist:
         print("No SPX_CLOSE series found. Run markets ETL first.")
-        return
+        return None
 
     qs = Observation.objects.filter(series=spx_series).order_by("date")
     if not qs.exists():
         print("No SPX observations found.")
-        return
+        return None
+
+    return qs.first().date, qs.last().date
+
+
+def build_features_for_all_dates() -> int:
+    """
+    Rebuild every FeatureFrame from the first to the last SPX_CLOSE date.
 
-    start_date = qs.first().date
-    end_date = qs.last().date
+    Uses the vectorized builder; build_features_for_date remains the
+    row-by-row reference implementation.
+    """
+    date_range = _spx_date_range()
+    if date_range is None:
+        return 0
+    start_date, end_date = date_range
 
     print(f"Building features from {start_date} to {end_date} ...")
 
-    with transaction.atomic():
-        d = start_date
-        count = 0
-        while d <= end_date:
-            build_features_for_date(d)
-            count = count + 1
-            d = d + timedelta(days = 1)
+    df = compute_feature_frame(start_date, end_date)
+    count = write_feature_frame(df)
+
+    print(f"Created/updated {count} FeatureFrame rows.")
+    return count
+
+
+def build_features_since(changed_since: date) -> int:
+    """
+    Rebuild only the FeatureFrames affected by observations changed on or
+    after `changed_since`.
+
+    Forward-filled values propagate, so every row from that date to the last
+    SPX date is recomputed. The row before it is included too: its
+    next-day target/label looks one day ahead. Falls back to a full rebuild
+    when no FeatureFrame rows exist yet.
+    """
+    if not FeatureFrame.objects.exists():
+        return build_features_for_all_dates()
+
+    date_range = _spx_date_range()
+    if date_range is None:
+        return 0
+    first_date, end_date = date_range
+
+    start_date = max(first_date, changed_since - timedelta(days=1))
+    if start_date > end_date:
+        print(f"No FeatureFrame rows affected by changes since {changed_since}.")
+        return 0
+
+    print(f"Rebuilding features from {start_date} to {end_date} (changes since {changed_since}) ...")
+
+    df = compute_feature_frame(start_date, end_date)
+    count = write_feature_frame(df)
 
     print(f"Created/updated {count} FeatureFrame rows.")
+    return count
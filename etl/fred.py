@@ -1,14 +1,30 @@
 import os 
-from datetime import datetime
-from typing import List, Tuple, Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
+from typing import Any, List, Tuple, Dict, Optional
 
 import requests
 
-from core.models import Series, Observation
+from core.models import Observation
+from etl.ingest import get_or_create_series, upsert_observations, format_stats
+from etl.ratelimit import TokenBucket
 
 FRED_API_KEY = os.getenv("FRED_API_KEY")
 FRED_API_URL = "https://api.stlouisfed.org/fred/series/observations"
 
+# FRED revises recent prints (CPI, PCE, payrolls...) for a few months after
+# release, so incremental fetches re-request this many days before the last
+# stored observation.
+FRED_REVISION_DAYS = int(os.getenv("FRED_REVISION_DAYS", "180"))
+
+# FRED allows 120 requests per minute per API key. Fetches run on a small
+# thread pool and every request takes a token from a shared bucket first.
+FRED_MAX_WORKERS = int(os.getenv("FRED_MAX_WORKERS", "4"))
+FRED_REQUESTS_PER_MINUTE = int(os.getenv("FRED_REQUESTS_PER_MINUTE", "120"))
+FRED_REQUEST_TIMEOUT = 30
+
+_fred_rate_limiter = TokenBucket.per_minute(FRED_REQUESTS_PER_MINUTE, burst=FRED_MAX_WORKERS)
+
 FRED_SERIES_MAP: Dict[str, str] = {          # 8
     "CPIAUCSL": "CPI",                       # 9
     "CPILFESL": "CoreCPI",                   # 10
@@ -22,7 +38,10 @@ FRED_SERIES_MAP: Dict[str, str] = {          # 8
 }
 
 
-def fetch_fred_series(series_id: str) -> List[Tuple[datetime.date, float]]:
+def fetch_fred_series(
+    series_id: str,
+    observation_start: Optional[date] = None,
+) -> List[Tuple[datetime.date, float]]:
     if not FRED_API_KEY:
         raise RuntimeError("FRED_API_KEY is not set in environment")
 
@@ -31,8 +50,11 @@ def fetch_fred_series(series_id: str) -> List[Tuple[datetime.date, float]]:
         "api_key" : FRED_API_KEY,
         "file_type": "json",
     }
+    if observation_start is not None:
+        params["observation_start"] = observation_start.isoformat()
 
-    resp = requests.get(FRED_API_URL, params = params)
+    _fred_rate_limiter.acquire()
+    resp = requests.get(FRED_API_URL, params = params, timeout = FRED_REQUEST_TIMEOUT)
     resp.raise_for_status()
     payload = resp.json()
     observations = payload["observations"]
@@ -47,25 +69,76 @@ def fetch_fred_series(series_id: str) -> List[Tuple[datetime.date, float]]:
 
     return rows
 
-def run_fred_etl() -> None:
+def get_observation_start(series, revision_days: int = FRED_REVISION_DAYS) -> Optional[date]:
+    """
+    Start date for an incremental fetch: the last stored observation minus
+    the revision window, or None (full history) if nothing is stored yet.
+    """
+    last = (
+        Observation.objects
+        .filter(series=series)
+        .order_by("-date")
+        .values_list("date", flat=True)
+        .first()
+    )
+    if last is None:
+        return None
+    return last - timedelta(days=revision_days)
+
+
+def run_fred_etl(
+    full: bool = False,
+    revision_days: int = FRED_REVISION_DAYS,
+    max_workers: int = FRED_MAX_WORKERS,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Refresh every series in FRED_SERIES_MAP.
+
+    By default only the tail of each series is requested (see
+    `get_observation_start`); pass full=True to download the whole history.
+
+    HTTP fetches run concurrently on a bounded thread pool behind the shared
+    rate limiter; DB writes then happen one series at a time on the calling
+    thread. A series that fails to fetch or store is reported as
+    {"error": "..."} in the result instead of aborting the batch.
+    """
+    if not FRED_API_KEY:
+        raise RuntimeError("FRED_API_KEY is not set in environment")
+
+    # DB lookups stay on this thread; workers only talk to FRED.
+    plan = []
     for fred_id, code in FRED_SERIES_MAP.items():
-        print(f"Fetching {fred_id} -> {code} ...")
-        rows = fetch_fred_series(fred_id)
-        series, _ = Series.objects.get_or_create(
-            code = code,
-            defaults = {
-                "name": code,
-                "freq": "M",
-                "source" : "FRED", 
-            },
-        )
-
-        count = 0
-        for dt, val in rows:
-            Observation.objects.update_or_create(
-                series = series,
-                date = dt,
-                defaults ={"value": val},
-            )
-            count = count + 1
-        print(f" -> stored {count} rows for {code}")
\ No newline at end of file
+        series = get_or_create_series(code, name=code, freq="M", source="FRED")
+        start = None if full else get_observation_start(series, revision_days)
+        plan.append((fred_id, code, series, start))
+
+    print(f"Fetching {len(plan)} FRED series with {max_workers} workers ...")
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            code: pool.submit(fetch_fred_series, fred_id, start)
+            for fred_id, code, _, start in plan
+        }
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for fred_id, code, series, start in plan:
+            try:
+                rows = futures[code].result()
+            except Exception as e:
+                print(f" ! {fred_id} -> {code}: fetch failed: {e}")
+                results[code] = {"error": f"fetch failed: {e}"}
+                continue
+
+            try:
+                stats = upsert_observations(series, rows)
+            except Exception as e:
+                print(f" ! {fred_id} -> {code}: store failed: {e}")
+                results[code] = {"error": f"store failed: {e}"}
+                continue
+
+            results[code] = stats
+            print(f" -> {code} (from {start or 'start of history'}): {format_stats(stats)}")
+
+    failed = [code for code, stats in results.items() if "error" in stats]
+    if failed:
+        print(f"FRED ETL finished with {len(failed)} failed series: {', '.join(failed)}")
+    return results
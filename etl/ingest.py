@@ -0,0 +1,117 @@
+"""
+Shared ingestion layer for Observation rows.
+
+Every ETL source (FRED, yfinance, ...) ends up with a list of
+(date, value) pairs for one Series. Instead of calling
+`update_or_create` per row (a SELECT plus an INSERT/UPDATE each),
+`upsert_observations` loads the existing pairs for the series in one
+query, diffs them in memory and only writes rows that are new or whose
+value changed, in batches and inside a single transaction.
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+
+from core.models import Series, Observation
+from core.series_index import bump_generation
+
+# Rows per INSERT / UPDATE statement. Keeps us well below SQLite's
+# variable limit while still collapsing thousands of round trips.
+UPSERT_BATCH_SIZE = 1000
+
+
+def get_or_create_series(code: str, name: str, freq: str, source: str) -> Series:
+    series, _ = Series.objects.get_or_create(
+        code=code,
+        defaults={
+            "name": name,
+            "freq": freq,
+            "source": source,
+        },
+    )
+    return series
+
+
+def upsert_observations(
+    series: Series,
+    rows: Iterable[Tuple[date, float]],
+    batch_size: int = UPSERT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Write `rows` for `series`, touching only new or changed dates.
+
+    Duplicate dates in `rows` are collapsed (last one wins).
+
+    Returns a dict with "inserted", "updated" and "unchanged" counts plus
+    "first_changed", the earliest inserted/updated date (None if nothing
+    was written). Downstream stages use it to rebuild only what changed.
+    """
+    incoming: Dict[date, float] = {}
+    for dt, val in rows:
+        incoming[dt] = float(val)
+
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0, "first_changed": None}
+    if not incoming:
+        return stats
+
+    with transaction.atomic():
+        # Only the incoming date range can differ, so incremental loads
+        # never read the whole history back.
+        existing = {
+            dt: (pk, val)
+            for pk, dt, val in Observation.objects
+            .filter(series=series, date__gte=min(incoming), date__lte=max(incoming))
+            .values_list("id", "date", "value")
+        }
+
+        to_create = []
+        to_update = []
+        for dt, val in incoming.items():
+            current = existing.get(dt)
+            if current is None:
+                to_create.append(Observation(series=series, date=dt, value=val))
+            elif current[1] != val:
+                to_update.append(Observation(id=current[0], series=series, date=dt, value=val))
+            else:
+                stats["unchanged"] += 1
+
+        if to_create:
+            # update_conflicts keeps this safe if another writer inserted
+            # the same (series, date) between our read and this write.
+            Observation.objects.bulk_create(
+                to_create,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["series", "date"],
+                update_fields=["value"],
+            )
+        if to_update:
+            Observation.objects.bulk_update(to_update, ["value"], batch_size=batch_size)
+        if to_create or to_update:
+            bump_generation([series.pk])
+
+    stats["inserted"] = len(to_create)
+    stats["updated"] = len(to_update)
+    if to_create or to_update:
+        stats["first_changed"] = min(obs.date for obs in to_create + to_update)
+    return stats
+
+
+def earliest_change(results: Dict[str, Dict[str, Any]]) -> Optional[date]:
+    """Earliest "first_changed" date across per-series ETL results."""
+    changed = [
+        stats["first_changed"]
+        for stats in results.values()
+        if stats.get("first_changed") is not None
+    ]
+    return min(changed) if changed else None
+
+
+def format_stats(stats: Dict[str, int]) -> str:
+    return (
+        f"{stats['inserted']} inserted, "
+        f"{stats['updated']} updated, "
+        f"{stats['unchanged']} unchanged"
+    )
@@ -1,8 +1,8 @@
 import datetime as dt
-from typing import Dict, Tuple
+from typing import Any, Dict, Tuple
 import pandas as pd
 import yfinance as yf
-from core.models import Series, Observation
+from etl.ingest import get_or_create_series, upsert_observations, format_stats
 
 # Map of tickers to fetch. SPY is used for both SPX_CLOSE (close price) and SPY_VOLUME
 YF_TICKERS = {
@@ -34,7 +34,14 @@ def fetch_yf_history(ticker:str, period: str = "max"):
                 print(f"Alternative ticker {alt_ticker} also failed: {e2}")
         return pd.DataFrame()  # Return empty DataFrame on failure
 
-def run_markets_etl(period:str = "max"):
+def frame_column_rows(df: pd.DataFrame, column: str):
+    """Turn one column of a yfinance history frame into (date, value) pairs."""
+    return [(ts.date(), float(val)) for ts, val in df[column].items()]
+
+
+def run_markets_etl(period:str = "max") -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+
     # Fetch SPY data (used for both SPX_CLOSE and SPY_VOLUME)
     print("Fetching SPY -> SPX_CLOSE and SPY_VOLUME ...")
     spy_df = fetch_yf_history("SPY", period=period)
@@ -43,38 +50,14 @@ def run_markets_etl(period:str = "max"):
         spy_df = spy_df.sort_index()
         
         # Store SPX_CLOSE (using SPY close price as proxy)
-        spx_series, _ = Series.objects.get_or_create(
-            code="SPX_CLOSE",
-            defaults={"name": "S&P 500 Close", "freq": "D", "source": "YF"},
-        )
-        spx_count = 0
-        for date_index, row in spy_df.iterrows():
-            value = float(row['Close'])
-            as_date = date_index.date()
-            Observation.objects.update_or_create(
-                series=spx_series,
-                date=as_date,
-                defaults={"value": value},
-            )
-            spx_count += 1
-        print(f" -> stored {spx_count} rows for SPX_CLOSE")
+        spx_series = get_or_create_series("SPX_CLOSE", name="S&P 500 Close", freq="D", source="YF")
+        results["SPX_CLOSE"] = upsert_observations(spx_series, frame_column_rows(spy_df, "Close"))
+        print(f" -> SPX_CLOSE: {format_stats(results['SPX_CLOSE'])}")
         
         # Store SPY_VOLUME
-        vol_series, _ = Series.objects.get_or_create(
-            code="SPY_VOLUME",
-            defaults={"name": "SPY Volume", "freq": "D", "source": "YF"},
-        )
-        vol_count = 0
-        for date_index, row in spy_df.iterrows():
-            value = float(row['Volume'])
-            as_date = date_index.date()
-            Observation.objects.update_or_create(
-                series=vol_series,
-                date=as_date,
-                defaults={"value": value},
-            )
-            vol_count += 1
-        print(f" -> stored {vol_count} rows for SPY_VOLUME")
+        vol_series = get_or_create_series("SPY_VOLUME", name="SPY Volume", freq="D", source="YF")
+        results["SPY_VOLUME"] = upsert_observations(vol_series, frame_column_rows(spy_df, "Volume"))
+        print(f" -> SPY_VOLUME: {format_stats(results['SPY_VOLUME'])}")
     else:
         print("No SPY data returned")
     
@@ -84,21 +67,10 @@ def run_markets_etl(period:str = "max"):
     
     if not vix_df.empty:
         vix_df = vix_df.sort_index()
-        vix_series, _ = Series.objects.get_or_create(
-            code="VIX",
-            defaults={"name": "VIX Index", "freq": "D", "source": "YF"},
-        )
-        vix_count = 0
-        for date_index, row in vix_df.iterrows():
-            value = float(row['Close'])
-            as_date = date_index.date()
-            Observation.objects.update_or_create(
-                series=vix_series,
-                date=as_date,
-                defaults={"value": value},
-            )
-            vix_count += 1
-        print(f" -> stored {vix_count} rows for VIX")
+        vix_series = get_or_create_series("VIX", name="VIX Index", freq="D", source="YF")
+        results["VIX"] = upsert_observations(vix_series, frame_column_rows(vix_df, "Close"))
+        print(f" -> VIX: {format_stats(results['VIX'])}")
     else:
         print("No VIX data returned")
 
+    return results
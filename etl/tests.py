@@ -3,7 +3,7 @@ from datetime import date, timedelta
 from unittest.mock import patch, MagicMock
 import pandas as pd
 
-from core.models import Series, Observation
+from core.models import Series, Observation, FeatureFrame
 from etl.features import get_series_value_on_or_before, build_features_for_date
 
 
@@ -84,6 +84,60 @@ class FeaturesTest(TestCase):
         self.assertIn("vix_close", ff.features)
 
 
+class FeatureFixtureMixin:
+    """Small multi-series dataset shared by the feature builder tests."""
+
+    def setUp(self):
+        from etl.ingest import get_or_create_series, upsert_observations
+        start = date(2024, 1, 1)
+        # Business-day SPX/VIX/volume with weekend gaps, a monthly CPI that
+        # starts later, and a US2Y series that only starts mid-range.
+        business_days = [d.date() for d in pd.bdate_range(start, periods=40)]
+        daily = {
+            "SPX_CLOSE": [(d, 4500.0 + (i % 7) * 3.5 - i) for i, d in enumerate(business_days)],
+            "VIX": [(d, 15.0 + (i % 5)) for i, d in enumerate(business_days)],
+            "SPY_VOLUME": [(d, 1e6 + i * 1000) for i, d in enumerate(business_days)],
+            "US10Y": [(d, 4.0 + i * 0.01) for i, d in enumerate(business_days)],
+            "US2Y": [(d, 4.5 - i * 0.01) for i, d in enumerate(business_days[10:])],
+        }
+        monthly = {
+            "CPI": [(date(2024, 1, 15), 308.0), (date(2024, 2, 1), 309.5)],
+            "Unemployment": [(date(2023, 12, 1), 3.7), (date(2024, 2, 1), 3.9)],
+        }
+        for code, rows in {**daily, **monthly}.items():
+            series = get_or_create_series(code, name=code, freq="D", source="TEST")
+            upsert_observations(series, rows)
+        self.start = business_days[0]
+        self.end = business_days[-1]
+
+    def _snapshot(self):
+        return {
+            ff.date: (ff.features, ff.target, ff.label)
+            for ff in FeatureFrame.objects.order_by("date")
+        }
+
+
+class VectorizedFeaturesTest(FeatureFixtureMixin, TestCase):
+    """Test that the vectorized builder matches the row-by-row builder."""
+
+    def test_vectorized_matches_row_by_row(self):
+        """Test exact equality of features, target and label for every date."""
+        from etl.features import build_features_for_all_dates
+
+        build_features_for_all_dates()
+        vectorized = self._snapshot()
+
+        FeatureFrame.objects.all().delete()
+        d = self.start
+        while d <= self.end:
+            build_features_for_date(d)
+            d += timedelta(days=1)
+        row_by_row = self._snapshot()
+
+        self.assertEqual(len(vectorized), (self.end - self.start).days + 1)
+        self.assertEqual(vectorized, row_by_row)
+
+
 class MarketsETLTest(TestCase):
     """Test market ETL functionality."""
     
@@ -117,3 +171,272 @@ class MarketsETLTest(TestCase):
         result = fetch_yf_history("INVALID", period="1mo")
         
         self.assertTrue(result.empty)
+
+
+class IngestTest(TestCase):
+    """Test the diff-based Observation upsert engine."""
+
+    def setUp(self):
+        from etl.ingest import get_or_create_series
+        self.series = get_or_create_series("TEST_INGEST", name="Test Ingest", freq="D", source="TEST")
+        self.start = date(2024, 1, 1)
+
+    def test_upsert_inserts_new_rows(self):
+        """Test that all rows are inserted into an empty series."""
+        from etl.ingest import upsert_observations
+        rows = [(self.start + timedelta(days=i), 100.0 + i) for i in range(5)]
+
+        stats = upsert_observations(self.series, rows)
+
+        self.assertEqual(stats, {"inserted": 5, "updated": 0, "unchanged": 0, "first_changed": self.start})
+        self.assertEqual(Observation.objects.filter(series=self.series).count(), 5)
+
+    def test_upsert_diffs_against_existing_rows(self):
+        """Test that only new or changed rows are written."""
+        from etl.ingest import upsert_observations
+        upsert_observations(self.series, [(self.start + timedelta(days=i), 100.0 + i) for i in range(3)])
+
+        rows = [
+            (self.start, 100.0),                      # unchanged
+            (self.start + timedelta(days=1), 999.0),  # revised
+            (self.start + timedelta(days=2), 102.0),  # unchanged
+            (self.start + timedelta(days=3), 103.0),  # new
+        ]
+        stats = upsert_observations(self.series, rows)
+
+        self.assertEqual(stats, {
+            "inserted": 1,
+            "updated": 1,
+            "unchanged": 2,
+            "first_changed": self.start + timedelta(days=1),
+        })
+        revised = Observation.objects.get(series=self.series, date=self.start + timedelta(days=1))
+        self.assertEqual(revised.value, 999.0)
+
+    @patch('etl.markets.fetch_yf_history')
+    def test_run_markets_etl_returns_counts(self, mock_fetch):
+        """Test that the markets ETL reports per-series counts."""
+        mock_fetch.return_value = pd.DataFrame({
+            'Close': [4500.0, 4510.0],
+            'Volume': [1000000, 1100000]
+        }, index=pd.date_range('2024-01-01', periods=2))
+
+        from etl.markets import run_markets_etl
+        first = run_markets_etl(period="1mo")
+        second = run_markets_etl(period="1mo")
+
+        self.assertEqual(first["SPX_CLOSE"]["inserted"], 2)
+        self.assertEqual(second["SPX_CLOSE"], {
+            "inserted": 0,
+            "updated": 0,
+            "unchanged": 2,
+            "first_changed": None,
+        })
+        self.assertEqual(second["VIX"]["unchanged"], 2)
+
+
+class FredETLTest(TestCase):
+    """Test incremental FRED fetching."""
+
+    def setUp(self):
+        from etl.ingest import get_or_create_series, upsert_observations
+        self.series = get_or_create_series("CPI", name="CPI", freq="M", source="FRED")
+        upsert_observations(self.series, [(date(2024, 1, 1), 300.0), (date(2024, 6, 1), 310.0)])
+
+    def test_observation_start_uses_revision_window(self):
+        """Test that the start date is the last observation minus the revision window."""
+        from etl.fred import get_observation_start
+        start = get_observation_start(self.series, revision_days=31)
+        self.assertEqual(start, date(2024, 5, 1))
+
+    def test_observation_start_empty_series(self):
+        """Test that an empty series falls back to the full history."""
+        from etl.fred import get_observation_start
+        from etl.ingest import get_or_create_series
+        empty = get_or_create_series("US2Y", name="US2Y", freq="M", source="FRED")
+        self.assertIsNone(get_observation_start(empty))
+
+    @patch('etl.fred.FRED_API_KEY', 'test-key')
+    @patch('etl.fred.requests.get')
+    def test_fetch_passes_observation_start(self, mock_get):
+        """Test that incremental fetches send observation_start to FRED."""
+        mock_get.return_value.json.return_value = {
+            "observations": [
+                {"date": "2024-07-01", "value": "311.5"},
+                {"date": "2024-08-01", "value": "."},
+            ]
+        }
+
+        from etl.fred import fetch_fred_series
+        rows = fetch_fred_series("CPIAUCSL", observation_start=date(2024, 5, 1))
+
+        self.assertEqual(mock_get.call_args.kwargs["params"]["observation_start"], "2024-05-01")
+        self.assertEqual(rows, [(date(2024, 7, 1), 311.5)])
+
+    @patch('etl.fred.FRED_API_KEY', 'test-key')
+    @patch('etl.fred.fetch_fred_series')
+    def test_run_fred_etl_isolates_failures(self, mock_fetch):
+        """Test that one failing series does not abort the rest of the batch."""
+        def fake_fetch(series_id, observation_start=None):
+            if series_id == "UNRATE":
+                raise RuntimeError("boom")
+            return [(date(2024, 7, 1), 1.0)]
+        mock_fetch.side_effect = fake_fetch
+
+        from etl.fred import run_fred_etl, FRED_SERIES_MAP
+        results = run_fred_etl(max_workers=2)
+
+        self.assertEqual(len(results), len(FRED_SERIES_MAP))
+        self.assertIn("error", results["Unemployment"])
+        self.assertEqual(results["CPI"]["inserted"], 1)
+
+
+class TokenBucketTest(TestCase):
+    """Test the token-bucket rate limiter."""
+
+    def test_acquire_waits_when_bucket_is_empty(self):
+        """Test that acquiring beyond capacity blocks for about one token interval."""
+        import time
+        from etl.ratelimit import TokenBucket
+
+        bucket = TokenBucket(rate=20.0, capacity=2)
+        started = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        elapsed = time.monotonic() - started
+
+        self.assertGreaterEqual(elapsed, 0.04)
+
+
+class IncrementalFeaturesTest(FeatureFixtureMixin, TestCase):
+    """Test that dirty-range rebuilds match a full rebuild."""
+
+    def test_rebuild_since_matches_full_rebuild(self):
+        """Test that revising one observation and rebuilding from it matches a full rebuild."""
+        from etl.features import build_features_for_all_dates, build_features_since
+        from etl.ingest import upsert_observations
+
+        build_features_for_all_dates()
+
+        # Revise a CPI print and add a new SPX bar.
+        changed = date(2024, 2, 1)
+        cpi_stats = upsert_observations(Series.objects.get(code="CPI"), [(changed, 310.25)])
+        spx_stats = upsert_observations(
+            Series.objects.get(code="SPX_CLOSE"),
+            [(self.end + timedelta(days=3), 4200.0)],
+        )
+        since = min(cpi_stats["first_changed"], spx_stats["first_changed"])
+        self.assertEqual(since, changed)
+
+        build_features_since(since)
+        incremental = self._snapshot()
+
+        FeatureFrame.objects.all().delete()
+        build_features_for_all_dates()
+        full = self._snapshot()
+
+        self.assertEqual(incremental, full)
+
+    def test_rebuild_since_refreshes_previous_label(self):
+        """Test that a new bar refreshes the previous row's target/label."""
+        from etl.features import build_features_for_all_dates, build_features_since
+        from etl.ingest import upsert_observations
+
+        build_features_for_all_dates()
+        last_before = FeatureFrame.objects.get(date=self.end)
+        self.assertEqual(last_before.target, 0.0)
+
+        new_day = self.end + timedelta(days=1)
+        upsert_observations(Series.objects.get(code="SPX_CLOSE"), [(new_day, 9000.0)])
+        build_features_since(new_day)
+
+        last_after = FeatureFrame.objects.get(date=self.end)
+        self.assertGreater(last_after.target, 0.0)
+        self.assertEqual(last_after.label, 1)
+
+    def test_series_load_is_anchored(self):
+        """Test that a rebuild window loads only the as-of anchor and later rows."""
+        from etl.features import load_series_frame
+        spx = Observation.objects.filter(series__code="SPX_CLOSE").order_by("date")
+        dates = list(spx.values_list("date", flat=True))
+        since = dates[-2] + timedelta(days=1)
+
+        loaded = load_series_frame("SPX_CLOSE", since)
+        self.assertEqual([ts.date() for ts in loaded.index], dates[-2:])
+
+
+class DerivedSeriesTest(TestCase):
+    """Test the derived-series registry (YoY, spreads, drawdowns)."""
+
+    def setUp(self):
+        from etl.ingest import get_or_create_series, upsert_observations
+        self.spx = get_or_create_series("SPX_CLOSE", name="S&P 500 Close", freq="D", source="YF")
+        self.closes = [100.0, 110.0, 99.0, 105.0, 121.0, 96.8]
+        self.days = [date(2024, 1, 1) + timedelta(days=i) for i in range(len(self.closes))]
+        upsert_observations(self.spx, zip(self.days[:4], self.closes[:4]))
+
+    def _values(self, code):
+        return list(
+            Observation.objects.filter(series__code=code).order_by("date").values_list("value", flat=True)
+        )
+
+    def test_drawdown_full_build(self):
+        """Test the running peak and drawdown from scratch."""
+        from etl.derived import run_derived_etl
+        run_derived_etl()
+
+        self.assertEqual(Series.objects.get(code="SPX_DRAWDOWN").source, "DERIVED")
+        self.assertEqual(self._values("SPX_PEAK"), [100.0, 110.0, 110.0, 110.0])
+        drawdowns = self._values("SPX_DRAWDOWN")
+        self.assertEqual(drawdowns[:2], [0.0, 0.0])
+        self.assertAlmostEqual(drawdowns[2], -0.1)
+
+    def test_drawdown_incremental_matches_full_build(self):
+        """Test that new bars extend from the stored peak and match a full rebuild."""
+        from etl.derived import run_derived_etl
+        from etl.ingest import upsert_observations
+        run_derived_etl()
+
+        stats = upsert_observations(self.spx, zip(self.days[4:], self.closes[4:]))
+        result = run_derived_etl({"SPX_CLOSE": stats})
+        self.assertEqual(result["SPX_PEAK"]["inserted"], 2)
+        self.assertEqual(result["SPX_PEAK"]["unchanged"], 0)
+        incremental = (self._values("SPX_PEAK"), self._values("SPX_DRAWDOWN"))
+
+        Observation.objects.filter(series__code__in=["SPX_PEAK", "SPX_DRAWDOWN"]).delete()
+        run_derived_etl(full=True)
+        full = (self._values("SPX_PEAK"), self._values("SPX_DRAWDOWN"))
+
+        self.assertEqual(incremental, full)
+        self.assertAlmostEqual(full[1][-1], -0.2)
+
+    def test_unchanged_inputs_are_skipped(self):
+        """Test that specs whose inputs did not change are not recomputed."""
+        from etl.derived import run_derived_etl
+        run_derived_etl()
+
+        result = run_derived_etl({"CPI": {"first_changed": date(2024, 1, 1)}})
+        self.assertNotIn("SPX_DRAWDOWN", result)
+
+    def test_pct_change_and_diff(self):
+        """Test CPI YoY over 12 periods and the as-of aligned term spread."""
+        from etl.derived import run_derived_etl
+        from etl.ingest import get_or_create_series, upsert_observations
+        cpi = get_or_create_series("CPI", name="CPI", freq="M", source="FRED")
+        upsert_observations(cpi, [(date(2023, m, 1), 300.0) for m in range(1, 13)] + [(date(2024, 1, 1), 306.0)])
+        us10y = get_or_create_series("US10Y", name="US10Y", freq="M", source="FRED")
+        us2y = get_or_create_series("US2Y", name="US2Y", freq="M", source="FRED")
+        upsert_observations(us10y, [(date(2024, 1, 1), 4.0), (date(2024, 1, 3), 4.2)])
+        upsert_observations(us2y, [(date(2024, 1, 2), 4.5)])
+
+        run_derived_etl()
+
+        yoy = self._values("CPI_YOY")
+        self.assertEqual(len(yoy), 1)
+        self.assertAlmostEqual(yoy[0], 2.0)
+        spread = list(
+            Observation.objects.filter(series__code="TERM_SPREAD_10Y_2Y").order_by("date").values_list("date", "value")
+        )
+        self.assertEqual([d for d, _ in spread], [date(2024, 1, 2), date(2024, 1, 3)])
+        self.assertAlmostEqual(spread[0][1], -0.5)
+        self.assertAlmostEqual(spread[1][1], -0.3)
@@ -0,0 +1,131 @@
+"""
+Content-addressed storage for trained models.
+
+A model is pickled with joblib and identified by the sha256 of the
+pickle. Each distinct pickle is stored once, zlib-compressed, as a
+ModelBlob that any number of ModelArtifacts point to.
+
+Workers don't unpickle blobs straight from the database. The first
+worker on a node that needs a blob decompresses it into
+MODEL_ARTIFACT_CACHE_DIR (written to a temporary file, then renamed, so
+nobody reads a partial file). Every worker then loads it from there with
+mmap_mode="r": the numpy arrays of large estimators (boosted-tree
+nodes, linear coefficients) become shared, read-only pages instead of a
+private copy per worker. (sklearn's Tree, used by random forests, copies
+its nodes when unpickled, so forests only get the cheaper load.) Once the file exists, loading a model doesn't touch the
+database at all.
+
+prune_blobs only removes cached copies on the node that trains, so the
+cache of every other (serving) node grows by one file per new model.
+Each cache miss therefore also evicts cached files whose blob no longer
+exists in the database (evict_cache).
+"""
+
+import hashlib
+import os
+import tempfile
+import zlib
+from io import BytesIO
+from typing import Any, Optional
+
+import joblib
+
+from core.models import ModelBlob
+
+# Decompressed blobs shared by every worker on the node.
+MODEL_ARTIFACT_CACHE_DIR = os.getenv(
+    "MODEL_ARTIFACT_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "marketpulse-models"),
+)
+
+# zlib level for stored blobs.
+MODEL_ARTIFACT_COMPRESSION = int(os.getenv("MODEL_ARTIFACT_COMPRESSION", "6"))
+
+
+def cache_path(sha256: str, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or MODEL_ARTIFACT_CACHE_DIR, f"{sha256}.joblib")
+
+
+def _write_cache(sha256: str, raw: bytes, directory: Optional[str] = None) -> str:
+    path = cache_path(sha256, directory)
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write-then-rename so concurrent readers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(raw)
+    os.replace(tmp, path)
+    return path
+
+
+def store_model(model: Any) -> ModelBlob:
+    """The ModelBlob holding `model`, created unless an identical one exists."""
+    buffer = BytesIO()
+    joblib.dump(model, buffer)
+    raw = buffer.getvalue()
+    buffer.close()
+
+    sha256 = hashlib.sha256(raw).hexdigest()
+    blob = ModelBlob.objects.filter(sha256=sha256).only("sha256").first()
+    if blob is None:
+        blob, _ = ModelBlob.objects.get_or_create(
+            sha256=sha256,
+            defaults={"data": zlib.compress(raw, MODEL_ARTIFACT_COMPRESSION), "size": len(raw)},
+        )
+    # This node will load it next; no need to fetch it back
+    _write_cache(sha256, raw)
+    return blob
+
+
+def load_blob(sha256: str, mmap_mode: Optional[str] = "r", directory: Optional[str] = None) -> Any:
+    """
+    Unpickle the model with content hash `sha256` from the node's cache,
+    fetching and decompressing it from the database first if needed.
+    With mmap_mode=None the model gets private, writable arrays.
+    """
+    path = cache_path(sha256, directory)
+    if not os.path.exists(path):
+        data = ModelBlob.objects.filter(sha256=sha256).values_list("data", flat=True).first()
+        if data is None:
+            raise RuntimeError(f"Model blob {sha256} no longer exists.")
+        raw = zlib.decompress(bytes(data))
+        if hashlib.sha256(raw).hexdigest() != sha256:
+            raise RuntimeError(f"Model blob {sha256} is corrupt.")
+        path = _write_cache(sha256, raw, directory)
+        evict_cache(directory)
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+def evict_cache(directory: Optional[str] = None) -> int:
+    """
+    Remove cached models whose blob was deleted from the database (e.g.
+    by prune_blobs on another node). Returns how many were removed.
+    """
+    directory = directory or MODEL_ARTIFACT_CACHE_DIR
+    try:
+        cached = {name[:-len(".joblib")] for name in os.listdir(directory) if name.endswith(".joblib")}
+    except FileNotFoundError:
+        return 0
+    live = set(ModelBlob.objects.filter(sha256__in=cached).values_list("sha256", flat=True))
+    removed = 0
+    for sha256 in cached - live:
+        # Workers that have it memory-mapped keep their pages
+        try:
+            os.remove(cache_path(sha256, directory))
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def prune_blobs() -> int:
+    """Delete blobs no artifact points to (and this node's copies). Returns how many were deleted."""
+    orphans = list(ModelBlob.objects.filter(artifacts__isnull=True).values_list("sha256", flat=True))
+    deleted, _ = ModelBlob.objects.filter(sha256__in=orphans).delete()
+    for sha256 in orphans:
+        try:
+            os.remove(cache_path(sha256))
+        except FileNotFoundError:
+            pass
+    return deleted
@@ -0,0 +1,192 @@
+"""
+Walk-forward backtesting for the SPX direction model.
+
+A shuffled train/test split lets the model train on days that come after
+the days it is scored on. Walk-forward evaluation only ever trains on the
+past: each fold fits on a window of rows before a cut-off and scores the
+next `test_size` rows, then the cut-off moves forward by `step` rows.
+
+- expanding: every fold trains on all rows before its cut-off
+- rolling: every fold trains on the last `train_size` rows only
+
+Folds run in parallel on joblib's loky process pool. The feature matrix
+is written once to a temporary file and opened memory-mapped, so workers
+share its pages instead of each receiving a copy.
+
+This module deliberately doesn't import Django: loky workers import it to
+run `run_fold`.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
+
+# Rows are calendar days (one FeatureFrame per day).
+BACKTEST_MIN_TRAIN = int(os.getenv("BACKTEST_MIN_TRAIN", "730"))
+BACKTEST_TEST_SIZE = int(os.getenv("BACKTEST_TEST_SIZE", "90"))
+
+# Worker processes for the fold pool; kept small for the free-tier host.
+BACKTEST_N_JOBS = int(os.getenv("BACKTEST_N_JOBS", "2"))
+
+# VIX regimes used to break down the hit rate: [0, 15), [15, 25), [25, inf)
+VIX_REGIME_EDGES = [15.0, 25.0]
+VIX_REGIME_NAMES = ["low_vol", "normal", "high_vol"]
+
+Split = Tuple[int, int, int, int]  # train_start, train_end, test_start, test_end
+
+
+def walk_forward_splits(
+    n_rows: int,
+    min_train: int = BACKTEST_MIN_TRAIN,
+    test_size: int = BACKTEST_TEST_SIZE,
+    step: Optional[int] = None,
+    window: str = "expanding",
+    train_size: Optional[int] = None,
+) -> List[Split]:
+    """
+    Row ranges of each fold, oldest first. `step` defaults to `test_size`
+    (non-overlapping test windows); a rolling `train_size` defaults to
+    `min_train`.
+    """
+    if window not in ("expanding", "rolling"):
+        raise ValueError(f"Unknown window '{window}', expected 'expanding' or 'rolling'")
+    step = step or test_size
+    train_size = train_size or min_train
+
+    splits = []
+    cutoff = min_train
+    while cutoff < n_rows:
+        train_start = 0 if window == "expanding" else max(0, cutoff - train_size)
+        splits.append((train_start, cutoff, cutoff, min(cutoff + test_size, n_rows)))
+        cutoff += step
+    return splits
+
+
+@contextmanager
+def shared_arrays(*arrays: np.ndarray) -> Iterator[Tuple[np.ndarray, ...]]:
+    """
+    Read-only memory-mapped copies of `arrays`, backed by one temporary
+    file for the duration of the block. Passed to loky workers, they are
+    sent as file references and share pages instead of being pickled.
+    """
+    with tempfile.TemporaryDirectory(prefix="marketpulse-") as tmp:
+        path = os.path.join(tmp, "arrays.joblib")
+        joblib.dump(tuple(arrays), path)
+        yield joblib.load(path, mmap_mode="r")
+
+
+def vix_regimes(vix: np.ndarray) -> np.ndarray:
+    """Index into VIX_REGIME_NAMES for every VIX level."""
+    return np.searchsorted(VIX_REGIME_EDGES, vix, side="right")
+
+
+def _score(y_true: np.ndarray, proba: np.ndarray, regimes: np.ndarray) -> Dict[str, Any]:
+    pred = (proba >= 0.5).astype(int)
+    hit_rate_by_regime = {}
+    for code, name in enumerate(VIX_REGIME_NAMES):
+        mask = regimes == code
+        if mask.any():
+            hit_rate_by_regime[name] = {"hit_rate": float((pred[mask] == y_true[mask]).mean()), "n": int(mask.sum())}
+    both_classes = len(np.unique(y_true)) == 2
+    return {
+        "n": int(len(y_true)),
+        "accuracy": float(accuracy_score(y_true, pred)),
+        "auc": float(roc_auc_score(y_true, proba)) if both_classes else None,
+        "log_loss": float(log_loss(y_true, proba, labels=[0, 1])),
+        "up_rate": float(y_true.mean()),
+        "hit_rate_by_regime": hit_rate_by_regime,
+    }
+
+
+def run_fold(estimator, X: np.ndarray, y: np.ndarray, regimes: np.ndarray, split: Split):
+    """Fit on the train rows and return (test probabilities, metrics) or a skip reason."""
+    train_start, train_end, test_start, test_end = split
+    y_train = y[train_start:train_end]
+    if len(np.unique(y_train)) < 2:
+        return None, {"skipped": "training window has a single class"}
+
+    model = clone(estimator)
+    model.fit(X[train_start:train_end], y_train)
+    proba = model.predict_proba(X[test_start:test_end])[:, 1]
+    return proba, _score(y[test_start:test_end], proba, regimes[test_start:test_end])
+
+
+def _summarize(folds: List[Dict[str, Any]]) -> Dict[str, Any]:
+    scored = [f for f in folds if "skipped" not in f]
+    summary: Dict[str, Any] = {"folds": len(folds), "scored_folds": len(scored)}
+    for key in ("accuracy", "auc", "log_loss"):
+        values = [f[key] for f in scored if f.get(key) is not None]
+        summary[f"mean_{key}"] = float(np.mean(values)) if values else None
+        summary[f"std_{key}"] = float(np.std(values)) if values else None
+    return summary
+
+
+def walk_forward_backtest(
+    estimator,
+    X: np.ndarray,
+    y: np.ndarray,
+    regimes: Optional[np.ndarray] = None,
+    dates: Optional[Sequence] = None,
+    min_train: int = BACKTEST_MIN_TRAIN,
+    test_size: int = BACKTEST_TEST_SIZE,
+    step: Optional[int] = None,
+    window: str = "expanding",
+    train_size: Optional[int] = None,
+    n_jobs: int = BACKTEST_N_JOBS,
+) -> Dict[str, Any]:
+    """
+    Walk-forward evaluation of an (unfitted) sklearn classifier over
+    date-ordered rows. Returns a JSON-serializable dict with the scheme,
+    per-fold metrics, the mean / std of fold metrics, and metrics pooled
+    over every out-of-sample prediction ("overall").
+    """
+    X = np.ascontiguousarray(X, dtype=float)
+    y = np.asarray(y, dtype=int)
+    regimes = np.zeros(len(y), dtype=int) if regimes is None else np.asarray(regimes, dtype=int)
+    splits = walk_forward_splits(len(y), min_train, test_size, step, window, train_size)
+    if not splits:
+        raise RuntimeError(f"Not enough rows ({len(y)}) for a walk-forward backtest (min_train={min_train}).")
+
+    with shared_arrays(X, y, regimes) as (X_mm, y_mm, regimes_mm):
+        results = Parallel(n_jobs=n_jobs, backend="loky")(
+            delayed(run_fold)(estimator, X_mm, y_mm, regimes_mm, split) for split in splits
+        )
+
+    folds = []
+    oos_index, oos_proba = [], []
+    for i, (split, (proba, metrics)) in enumerate(zip(splits, results)):
+        train_start, train_end, test_start, test_end = split
+        fold = {"fold": i, "train_rows": train_end - train_start, **metrics}
+        if dates is not None:
+            fold["train_start"] = str(dates[train_start])
+            fold["test_start"] = str(dates[test_start])
+            fold["test_end"] = str(dates[test_end - 1])
+        folds.append(fold)
+        if proba is not None:
+            oos_index.append(np.arange(test_start, test_end))
+            oos_proba.append(proba)
+
+    overall = None
+    if oos_index:
+        idx = np.concatenate(oos_index)
+        overall = _score(y[idx], np.concatenate(oos_proba), regimes[idx])
+
+    return {
+        "scheme": {
+            "window": window,
+            "min_train": min_train,
+            "train_size": (train_size or min_train) if window == "rolling" else None,
+            "test_size": test_size,
+            "step": step or test_size,
+        },
+        "summary": _summarize(folds),
+        "overall": overall,
+        "folds": folds,
+    }
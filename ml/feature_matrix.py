@@ -0,0 +1,74 @@
+"""
+Columnar loading of FeatureFrame rows for training and batch scoring.
+
+Building one Python dict per row (and a DataFrame from the records) made
+memory and time grow with Python object overhead. load_feature_frame
+streams (date, features, label) tuples from the database in chunks and
+writes each requested feature straight into preallocated float32
+columns; a feature missing from a row is NaN. The DataFrame is then
+assembled from those columns.
+"""
+
+import os
+from datetime import date
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from core.models import FeatureFrame
+
+# Rows fetched from the database per round trip.
+FEATURE_LOAD_CHUNK_SIZE = int(os.getenv("FEATURE_LOAD_CHUNK_SIZE", "2000"))
+
+
+def load_feature_frame(
+    columns: Sequence[str],
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    labeled_only: bool = False,
+    with_features: bool = False,
+    chunk_size: int = FEATURE_LOAD_CHUNK_SIZE,
+) -> pd.DataFrame:
+    """
+    FeatureFrames in [start, end], oldest first, as a DataFrame with a
+    "date" column (datetime64), one float32 column per name in `columns`
+    and a float32 "label" column (NaN when unlabeled). `with_features`
+    adds the stored features dicts as an object column "features".
+    """
+    qs = FeatureFrame.objects.order_by("date")
+    if start is not None:
+        qs = qs.filter(date__gte=start)
+    if end is not None:
+        qs = qs.filter(date__lte=end)
+    if labeled_only:
+        qs = qs.exclude(label__isnull=True)
+
+    capacity = qs.count()
+    days = np.empty(capacity, dtype="datetime64[D]")
+    X = np.full((capacity, len(columns)), np.nan, dtype=np.float32)
+    labels = np.full(capacity, np.nan, dtype=np.float32)
+    features: List[dict] = []
+
+    n = 0
+    for d, feats, label in qs.values_list("date", "features", "label").iterator(chunk_size=chunk_size):
+        if n == capacity:
+            # Rows added since the count
+            capacity = max(2 * capacity, chunk_size)
+            days = np.resize(days, capacity)
+            X = np.concatenate([X, np.full((capacity - n, len(columns)), np.nan, dtype=np.float32)])
+            labels = np.concatenate([labels, np.full(capacity - n, np.nan, dtype=np.float32)])
+        days[n] = d
+        X[n] = [feats.get(col) for col in columns]  # None -> NaN
+        if label is not None:
+            labels[n] = label
+        if with_features:
+            features.append(feats)
+        n += 1
+
+    frame = pd.DataFrame(X[:n], columns=list(columns))
+    frame.insert(0, "date", days[:n].astype("datetime64[ns]"))
+    frame["label"] = labels[:n]
+    if with_features:
+        frame["features"] = features
+    return frame
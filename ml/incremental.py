@@ -0,0 +1,52 @@
+"""
+Incrementally updatable classifier for the SPX direction model.
+
+IncrementalLogit is a standardized logistic regression fit by SGD. After
+a full `fit`, `partial_fit` folds in a few new rows: the standardization
+statistics are updated in a streaming fashion (StandardScaler.partial_fit)
+and the SGD weights take one pass over the new rows only. That lets the
+nightly pipeline add the latest labeled day without refitting the whole
+history.
+
+Like ml.backtest, this module doesn't import Django.
+"""
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+CLASSES = np.array([0, 1])
+
+
+class IncrementalLogit(ClassifierMixin, BaseEstimator):
+    def __init__(self, alpha: float = 1e-4, max_iter: int = 1000, random_state: int = 0):
+        self.alpha = alpha
+        self.max_iter = max_iter
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        self.scaler_ = StandardScaler().fit(X)
+        self.clf_ = SGDClassifier(
+            loss="log_loss",
+            alpha=self.alpha,
+            max_iter=self.max_iter,
+            random_state=self.random_state,
+        )
+        self.clf_.fit(self.scaler_.transform(X), y)
+        self.classes_ = self.clf_.classes_
+        return self
+
+    def partial_fit(self, X, y):
+        """Update the scaling statistics and weights with new rows only."""
+        if not hasattr(self, "clf_"):
+            return self.fit(X, y)
+        self.scaler_.partial_fit(X)
+        self.clf_.partial_fit(self.scaler_.transform(X), y, classes=CLASSES)
+        return self
+
+    def predict_proba(self, X):
+        return self.clf_.predict_proba(self.scaler_.transform(X))
+
+    def predict(self, X):
+        return self.clf_.predict(self.scaler_.transform(X))
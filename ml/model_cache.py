@@ -0,0 +1,107 @@
+"""
+Per-process cache of trained models.
+
+Loading a model means unpickling it (from the node's artifact cache, see
+ml.artifact_store), which used to happen on every prediction request.
+ModelCache keeps the latest artifact of each model name in memory (a
+small LRU over names) and only asks the database for a newer artifact
+id every `check_interval` seconds. A newer artifact is loaded first and
+then swapped in, so requests never see a half-loaded model.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from django.db.models import Max
+
+from core.models import ModelArtifact
+from ml.artifact_store import load_blob
+
+# How often (seconds) a cached model checks for a newer artifact.
+MODEL_CACHE_CHECK_SECONDS = float(os.getenv("MODEL_CACHE_CHECK_SECONDS", "30"))
+
+# How many named models to keep loaded.
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "4"))
+
+
+class _Cached:
+    __slots__ = ("artifact_id", "model", "checked_at")
+
+    def __init__(self, artifact_id, model, checked_at):
+        self.artifact_id = artifact_id
+        self.model = model
+        self.checked_at = checked_at
+
+
+def load_artifact(artifact_id: int, mmap_mode: Optional[str] = "r") -> Any:
+    """
+    Deserialize the model of one ModelArtifact. Its arrays are read-only
+    memory maps unless `mmap_mode` is None.
+    """
+    sha256 = ModelArtifact.objects.filter(id=artifact_id).values_list("blob_id", flat=True).first()
+    if sha256 is None:
+        raise RuntimeError(f"Model artifact {artifact_id} no longer exists or its model was pruned.")
+    return load_blob(sha256, mmap_mode)
+
+
+class ModelCache:
+    def __init__(self, max_models: int = MODEL_CACHE_SIZE, check_interval: float = MODEL_CACHE_CHECK_SECONDS):
+        self.max_models = max_models
+        self.check_interval = check_interval
+        self._models: "OrderedDict[str, _Cached]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Forget one model (or all); the next `get` reloads it."""
+        with self._lock:
+            if name is None:
+                self._models.clear()
+            else:
+                self._models.pop(name, None)
+
+    def _cached(self, name: str) -> Optional[_Cached]:
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is not None:
+                self._models.move_to_end(name)
+            return entry
+
+    def get_with_id(self, name: str) -> Tuple[int, Any]:
+        """(artifact id, model) of the latest artifact named `name`."""
+        entry = self._cached(name)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked_at < self.check_interval:
+            return entry.artifact_id, entry.model
+
+        latest_id = ModelArtifact.objects.filter(name=name).aggregate(latest=Max("id"))["latest"]
+        if latest_id is None:
+            self.invalidate(name)
+            raise RuntimeError("No model artifact found in database. Train the model first.")
+
+        if entry is not None and entry.artifact_id == latest_id:
+            entry.checked_at = now
+            return entry.artifact_id, entry.model
+
+        # One load at a time; whoever waited may find the work done.
+        with self._load_lock:
+            entry = self._cached(name)
+            if entry is None or entry.artifact_id != latest_id:
+                entry = _Cached(latest_id, load_artifact(latest_id), now)
+                print(f"Loaded model '{name}' from artifact {latest_id}")
+                with self._lock:
+                    self._models[name] = entry
+                    self._models.move_to_end(name)
+                    while len(self._models) > self.max_models:
+                        self._models.popitem(last=False)
+        return entry.artifact_id, entry.model
+
+    def get(self, name: str) -> Any:
+        """The latest model named `name`; RuntimeError if none was trained."""
+        return self.get_with_id(name)[1]
+
+
+model_cache = ModelCache()
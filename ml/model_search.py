@@ -0,0 +1,207 @@
+"""
+Model-family and hyperparameter search for the SPX direction model.
+
+Each candidate (a model family plus parameters; "sgd" is the
+incrementally updatable ml.incremental.IncrementalLogit) is scored with
+time-ordered cross-validation: expanding walk-forward folds (see
+ml.backtest), so no candidate is ever trained on days after the ones it
+is scored on. Candidates are ranked by mean out-of-sample log-loss.
+
+- Folds of several candidates run together on the loky process pool,
+  sharing one memory-mapped feature matrix.
+- Scores are cached on disk under a fingerprint of the training data,
+  so an unchanged dataset never re-fits a configuration.
+- A wall-clock budget stops the search between batches; the first batch
+  (which starts with the incumbent logistic regression) always runs.
+
+Like ml.backtest, this module doesn't import Django.
+"""
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from ml.backtest import run_fold, shared_arrays, walk_forward_splits
+from ml.incremental import IncrementalLogit
+
+# Worker processes for the search (-1: every core).
+MODEL_SEARCH_N_JOBS = int(os.getenv("MODEL_SEARCH_N_JOBS", "-1"))
+
+# Stop starting new candidates after this many seconds.
+MODEL_SEARCH_BUDGET_SECONDS = float(os.getenv("MODEL_SEARCH_BUDGET_SECONDS", "600"))
+
+# Time-ordered CV folds per candidate.
+MODEL_SEARCH_SPLITS = int(os.getenv("MODEL_SEARCH_SPLITS", "5"))
+
+# Where evaluated configurations are remembered between runs.
+MODEL_SEARCH_CACHE_DIR = os.getenv(
+    "MODEL_SEARCH_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "marketpulse-model-search"),
+)
+
+Candidate = Tuple[str, Dict[str, Any]]
+
+# Incumbent first: it is always evaluated, whatever the budget.
+DEFAULT_CANDIDATES: List[Candidate] = [
+    ("logreg", {"C": 1.0}),
+    ("logreg", {"C": 0.1}),
+    ("logreg", {"C": 0.01}),
+    ("sgd", {"alpha": 1e-4}),
+    ("sgd", {"alpha": 1e-3}),
+    ("gbt", {"learning_rate": 0.05, "max_depth": 3}),
+    ("gbt", {"learning_rate": 0.1, "max_depth": 3}),
+    ("rf", {"max_depth": 4}),
+    ("rf", {"max_depth": 8}),
+]
+
+
+def make_estimator(family: str, params: Dict[str, Any]):
+    """Unfitted classifier for a candidate."""
+    if family == "logreg":
+        return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000, **params))
+    if family == "sgd":
+        # Can be updated incrementally (see ml.incremental)
+        return IncrementalLogit(**params)
+    if family == "gbt":
+        return HistGradientBoostingClassifier(max_iter=200, random_state=0, **params)
+    if family == "rf":
+        return RandomForestClassifier(n_estimators=200, min_samples_leaf=20, random_state=0, n_jobs=1, **params)
+    raise ValueError(f"Unknown model family '{family}'")
+
+
+def data_fingerprint(X: np.ndarray, y: np.ndarray) -> str:
+    """Stable hash of the training matrix and labels."""
+    digest = hashlib.sha1()
+    digest.update(str(X.shape).encode())
+    digest.update(np.ascontiguousarray(X, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=int).tobytes())
+    return digest.hexdigest()
+
+
+class ScoreCache:
+    """Candidate scores on disk, one JSON file per (data, candidate, CV scheme)."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or MODEL_SEARCH_CACHE_DIR
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    @staticmethod
+    def key(fingerprint: str, candidate: Candidate, n_splits: int) -> str:
+        # The estimator's repr covers fixed settings (n_estimators, ...) too
+        raw = json.dumps([fingerprint, repr(make_estimator(*candidate)), n_splits])
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, scores: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(scores, f)
+        os.replace(tmp, self._path(key))
+
+
+def _aggregate(fold_metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+    scored = [m for m in fold_metrics if "skipped" not in m]
+    scores: Dict[str, Any] = {"folds": len(scored)}
+    for key in ("log_loss", "accuracy", "auc"):
+        values = [m[key] for m in scored if m.get(key) is not None]
+        scores[key] = float(np.mean(values)) if values else None
+    return scores
+
+
+def search_models(
+    X: np.ndarray,
+    y: np.ndarray,
+    candidates: Optional[List[Candidate]] = None,
+    n_splits: int = MODEL_SEARCH_SPLITS,
+    budget_seconds: float = MODEL_SEARCH_BUDGET_SECONDS,
+    n_jobs: Optional[int] = None,
+    cache: Optional[ScoreCache] = None,
+) -> Dict[str, Any]:
+    """
+    Score every candidate (until the budget runs out) and return
+    {"best": {...}, "results": [...], "evaluated", "cached",
+    "skipped_for_budget", "fingerprint"}. Results are sorted best first.
+    `n_jobs` and the cache default to the MODEL_SEARCH_* settings.
+    """
+    candidates = DEFAULT_CANDIDATES if candidates is None else candidates
+    n_jobs = MODEL_SEARCH_N_JOBS if n_jobs is None else n_jobs
+    cache = ScoreCache() if cache is None else cache
+    X = np.ascontiguousarray(X, dtype=float)
+    y = np.asarray(y, dtype=int)
+
+    # Expanding folds of equal size over the whole history
+    test_size = len(y) // (n_splits + 1)
+    if test_size < 1:
+        raise RuntimeError(f"Not enough rows ({len(y)}) for {n_splits}-fold time-series CV.")
+    splits = walk_forward_splits(len(y), min_train=len(y) - n_splits * test_size, test_size=test_size)
+
+    fingerprint = data_fingerprint(X, y)
+    results: List[Dict[str, Any]] = []
+    pending: List[Tuple[Candidate, str]] = []
+    for candidate in candidates:
+        key = ScoreCache.key(fingerprint, candidate, n_splits)
+        scores = cache.get(key)
+        if scores is None:
+            pending.append((candidate, key))
+        else:
+            results.append({"family": candidate[0], "params": candidate[1], "cached": True, **scores})
+    cached = len(results)
+
+    # Enough candidates per batch to keep every worker busy
+    per_batch = max(1, math.ceil(effective_n_jobs(n_jobs) / len(splits)))
+    deadline = time.monotonic() + budget_seconds
+    regimes = np.zeros(len(y), dtype=int)
+    evaluated = 0
+    with shared_arrays(X, y, regimes) as (X_mm, y_mm, regimes_mm):
+        with Parallel(n_jobs=n_jobs, backend="loky") as parallel:
+            for start in range(0, len(pending), per_batch):
+                if start > 0 and time.monotonic() >= deadline:
+                    break
+                batch = pending[start:start + per_batch]
+                outputs = parallel(
+                    delayed(run_fold)(make_estimator(*candidate), X_mm, y_mm, regimes_mm, split)
+                    for candidate, _ in batch
+                    for split in splits
+                )
+                for i, (candidate, key) in enumerate(batch):
+                    fold_metrics = [m for _, m in outputs[i * len(splits):(i + 1) * len(splits)]]
+                    scores = _aggregate(fold_metrics)
+                    cache.set(key, scores)
+                    results.append({"family": candidate[0], "params": candidate[1], "cached": False, **scores})
+                    evaluated += 1
+
+    ranked = sorted(
+        (r for r in results if r["log_loss"] is not None),
+        key=lambda r: r["log_loss"],
+    )
+    if not ranked:
+        raise RuntimeError("No candidate could be scored (single-class training windows?).")
+    return {
+        "best": ranked[0],
+        "results": ranked,
+        "evaluated": evaluated,
+        "cached": cached,
+        "skipped_for_budget": len(pending) - evaluated,
+        "fingerprint": fingerprint,
+    }
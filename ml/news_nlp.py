@@ -196,6 +196,7 @@ def run_news_nlp(limit: int = 5):
                         "sentiment_score",
                         "summary",
                         "topics",
+                        "updated_at",
                     ]
                 )
 
@@ -1,13 +1,19 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import date
-from io import BytesIO
 
 import numpy as np
-import joblib
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery
 
-from core.models import FeatureFrame, ModelArtifact
+from core.models import FeatureFrame, ModelArtifact, Prediction
+from ml.feature_matrix import load_feature_frame
+from ml.model_cache import model_cache, load_artifact
 
 # Model is now stored in database, no file path needed
+SPX_MODEL_NAME = "spx_direction_logreg"
+
+# Rows per INSERT when storing predictions.
+PREDICTION_WRITE_BATCH_SIZE = 1000
 
 FEATURE_COLS: List[str] = [
     "spx_close",
@@ -36,24 +42,15 @@ def extract_feature_vector(ff: FeatureFrame) -> np.ndarray:
         if val is None:
             raise RuntimeError(f"Missing feature '{col}' for data {ff.date}")
         values.append(float(val))
-    return np.array(values, dtype=float).reshape(1,-1)
-
-def load_model():
-    # Load latest model from database
-    artifact = ModelArtifact.objects.filter(name="spx_direction_logreg").order_by("-created_at").first()
-    if artifact is None:
-        raise RuntimeError("No model artifact found in database. Train the model first.")
-    
-    # Use BytesIO to deserialize model from bytes
-    buffer = BytesIO(artifact.data)
-    model = joblib.load(buffer)
-    buffer.close()
-    return model
+    # Same precision as the training matrix (see ml.feature_matrix)
+    return np.array(values, dtype=np.float32).reshape(1,-1)
 
-def predict_latest_spx_direction() -> Dict[str, Any]:
-    ff = get_latest_feature_row()
+def load_model(name: str = SPX_MODEL_NAME):
+    # Latest model from database, loaded once per process (see ml.model_cache)
+    return model_cache.get(name)
+
+def score_feature_row(ff: FeatureFrame, model) -> Dict[str, Any]:
     X = extract_feature_vector(ff)
-    model = load_model()
 
     proba = model.predict_proba(X)[0,1]
     label = int(model.predict(X)[0])
@@ -64,4 +61,141 @@ def predict_latest_spx_direction() -> Dict[str, Any]:
         "label": label,
         "features": ff.features,
     }
-    return result
\ No newline at end of file
+    return result
+
+def predict_latest_spx_direction() -> Dict[str, Any]:
+    # Live scoring of the latest FeatureFrame
+    ff = get_latest_feature_row()
+    return score_feature_row(ff, load_model())
+
+def load_feature_matrix(start: Optional[date] = None, end: Optional[date] = None):
+    """
+    (dates, X) for every FeatureFrame in [start, end] that has all
+    FEATURE_COLS, with X as one (n_rows, n_features) float32 matrix.
+    """
+    frame = load_feature_frame(FEATURE_COLS, start, end).dropna(subset=FEATURE_COLS)
+    return frame["date"].dt.date.tolist(), frame[FEATURE_COLS].to_numpy()
+
+def _store_scores(artifact_id: int, model, dates, X, batch_size: int) -> int:
+    if not dates:
+        return 0
+    # One vectorized pass over the whole matrix
+    proba = model.predict_proba(X)[:, 1]
+    labels = model.predict(X)
+    predictions = [
+        Prediction(
+            model_id=artifact_id,
+            date=d,
+            yhat=float(p),
+            # Features stay in FeatureFrame; joined back when served
+            details={"label": int(label)},
+        )
+        for d, p, label in zip(dates, proba, labels)
+    ]
+    with transaction.atomic():
+        Prediction.objects.bulk_create(
+            predictions,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["model", "date"],
+            update_fields=["yhat", "details", "scored_at"],
+        )
+    return len(predictions)
+
+def backfill_predictions(
+    name: str = SPX_MODEL_NAME,
+    artifact_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    batch_size: int = PREDICTION_WRITE_BATCH_SIZE,
+    stale_only: bool = False,
+) -> int:
+    """
+    Score every FeatureFrame in [start, end] with one artifact (the
+    latest `name` artifact by default) and upsert one Prediction per date.
+    With `stale_only`, dates some `name` artifact has already scored
+    since their FeatureFrame was last updated are skipped. Returns the
+    number of dates scored.
+    """
+    if artifact_id is None:
+        artifact_id, model = model_cache.get_with_id(name)
+    else:
+        model = load_artifact(artifact_id)
+    dates, X = load_feature_matrix(start, end)
+    if stale_only and dates:
+        features_updated = FeatureFrame.objects.filter(date=OuterRef("date")).values("updated_at")[:1]
+        fresh = set(
+            Prediction.objects
+            .filter(model__name=name, date__gte=dates[0], date__lte=dates[-1])
+            .filter(scored_at__gte=Subquery(features_updated))
+            .values_list("date", flat=True)
+        )
+        keep = [i for i, d in enumerate(dates) if d not in fresh]
+        dates, X = [dates[i] for i in keep], X[keep]
+    written = _store_scores(artifact_id, model, dates, X, batch_size)
+    print(f"Stored {written} predictions for artifact {artifact_id}")
+    return written
+
+def store_predictions(artifact: ModelArtifact, new_artifact: bool) -> int:
+    """
+    Bring the stored predictions of `artifact`'s model up to date. A new
+    artifact scores the dates it changes (from its metrics' "scores_from",
+    the whole history after a full retrain); then any date that is new or
+    whose features changed since it was scored is scored with it. Earlier
+    artifacts' predictions of other dates are kept. Returns the number of
+    dates scored.
+    """
+    scored = 0
+    if new_artifact:
+        scores_from = (artifact.metrics or {}).get("scores_from")
+        scored += backfill_predictions(
+            artifact.name, artifact.id, start=scores_from and date.fromisoformat(scores_from)
+        )
+    return scored + backfill_predictions(artifact.name, artifact.id, stale_only=True)
+
+def store_latest_prediction(name: str = SPX_MODEL_NAME) -> Prediction:
+    """
+    Score the latest FeatureFrame with the latest model and save it as a
+    Prediction (one row per model artifact and date).
+    """
+    ff = get_latest_feature_row()
+    extract_feature_vector(ff)  # raises if a feature is missing
+    artifact_id, model = model_cache.get_with_id(name)
+    dates, X = load_feature_matrix(ff.date, ff.date)
+    _store_scores(artifact_id, model, dates, X, PREDICTION_WRITE_BATCH_SIZE)
+    return Prediction.objects.get(model_id=artifact_id, date=ff.date)
+
+def get_stored_prediction(name: str = SPX_MODEL_NAME) -> Optional[Dict[str, Any]]:
+    """
+    The stored prediction of the latest model for the latest FeatureFrame
+    date, shaped like `predict_latest_spx_direction()`, or None.
+    """
+    latest = FeatureFrame.objects.order_by("-date").values_list("date", "features").first()
+    latest_artifact = ModelArtifact.objects.filter(name=name).aggregate(latest=Max("id"))["latest"]
+    if latest is None or latest_artifact is None:
+        return None
+    latest_date, features = latest
+
+    row = (
+        Prediction.objects
+        .filter(model_id=latest_artifact, date=latest_date)
+        .values_list("yhat", "details")
+        .first()
+    )
+    if row is None:
+        return None
+    yhat, details = row
+    return {
+        "date": latest_date,
+        "prob_up": yhat,
+        "label": details["label"],
+        "features": features,
+    }
+
+def latest_spx_prediction() -> Dict[str, Any]:
+    # Stored by update_marketpulse; score live if it hasn't run since the
+    # latest features / model appeared.
+    stored = get_stored_prediction()
+    if stored is not None:
+        return stored
+    return predict_latest_spx_direction()
@@ -1,9 +1,29 @@
 from django.test import TestCase
 from datetime import date, timedelta
+import tempfile
 import numpy as np
 from unittest.mock import patch, MagicMock
 
-from core.models import FeatureFrame
+from core.models import FeatureFrame, ModelArtifact
+
+
+class TempArtifactCacheMixin:
+    """Materializes model blobs in a per-test directory (see ml.artifact_store)."""
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = patch("ml.artifact_store.MODEL_ARTIFACT_CACHE_DIR", tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+def _spx_bar(day):
+    """An SPX close on `day`: rows dated before it have a final label."""
+    from etl.ingest import get_or_create_series, upsert_observations
+    series = get_or_create_series("SPX_CLOSE", name="S&P 500 Close", freq="D", source="YF")
+    upsert_observations(series, [(day, 5000.0)])
 
 
 class MLPredictionTest(TestCase):
@@ -28,7 +48,7 @@ class MLPredictionTest(TestCase):
             label=1
         )
     
-    @patch('ml.predict_spx.load')
+    @patch('ml.predict_spx.load_model')
     @patch('ml.predict_spx.FeatureFrame')
     def test_predict_latest_spx_direction(self, mock_featureframe, mock_load):
         """Test SPX direction prediction."""
@@ -83,3 +103,583 @@ class MLPredictionTest(TestCase):
         self.assertIn("label", df.columns)
         self.assertIn("spx_close", df.columns)
 
+
+
+class FeatureMatrixTest(TestCase):
+    """Test the columnar FeatureFrame loader."""
+
+    def test_columns_gaps_and_chunks(self):
+        """Test float32 columns, NaN for missing features and labels, across chunks."""
+        from ml.feature_matrix import load_feature_frame
+        for i in range(5):
+            FeatureFrame.objects.create(
+                date=date(2024, 1, 1) + timedelta(days=i),
+                features={"a": float(i), "b": 10.0 * i} if i != 2 else {"a": 2.0},
+                label=i % 2 if i < 4 else None,
+            )
+
+        frame = load_feature_frame(["a", "b"], chunk_size=2)
+        self.assertEqual(list(frame.columns), ["date", "a", "b", "label"])
+        self.assertEqual(frame["a"].dtype, np.float32)
+        self.assertEqual(frame["a"].tolist(), [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertTrue(np.isnan(frame["b"][2]))
+        self.assertTrue(np.isnan(frame["label"][4]))
+        self.assertEqual(frame["date"].iloc[0].date(), date(2024, 1, 1))
+
+        labeled = load_feature_frame(["a"], start=date(2024, 1, 2), labeled_only=True, with_features=True)
+        self.assertEqual(labeled["a"].tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(labeled["features"][1], {"a": 2.0})
+
+
+class ModelCacheTest(TempArtifactCacheMixin, TestCase):
+    """Test the per-process model cache."""
+
+    def _save(self, name, model):
+        from ml.artifact_store import store_model
+        return ModelArtifact.objects.create(name=name, blob=store_model(model))
+
+    def test_serves_from_memory_until_newer_artifact(self):
+        """Test that a cached model is reused and swapped once a newer one is seen."""
+        from ml.model_cache import ModelCache
+        cache = ModelCache(check_interval=3600)
+        first = self._save("m", {"version": 1})
+        self.assertEqual(cache.get_with_id("m"), (first.id, {"version": 1}))
+
+        second = self._save("m", {"version": 2})
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get("m"), {"version": 1})
+
+        cache.check_interval = 0
+        with self.assertNumQueries(2):
+            self.assertEqual(cache.get_with_id("m"), (second.id, {"version": 2}))
+        with self.assertNumQueries(1):
+            self.assertEqual(cache.get("m"), {"version": 2})
+
+    def test_lru_and_missing(self):
+        """Test eviction of the least recently used name and the untrained error."""
+        from ml.model_cache import ModelCache
+        cache = ModelCache(max_models=2, check_interval=3600)
+        for name in ("a", "b", "c"):
+            self._save(name, name)
+        cache.get("a")
+        cache.get("b")
+        cache.get("a")
+        cache.get("c")  # evicts "b"
+        with self.assertNumQueries(0):
+            cache.get("a")
+            cache.get("c")
+        with self.assertNumQueries(2):
+            cache.get("b")
+
+        with self.assertRaises(RuntimeError):
+            cache.get("untrained")
+
+
+class ArtifactStoreTest(TempArtifactCacheMixin, TestCase):
+    """Test content-addressed model blobs and the on-disk artifact cache."""
+
+    def setUp(self):
+        super().setUp()
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        rng = np.random.default_rng(6)
+        X = rng.normal(size=(200, 3))
+        self.model = HistGradientBoostingClassifier(max_iter=5).fit(X, (X[:, 0] > 0).astype(int))
+
+    def test_blobs_are_compressed_and_deduplicated(self):
+        """Test an identical model is stored once, compressed."""
+        from core.models import ModelBlob
+        from ml.artifact_store import store_model
+        first = store_model(self.model)
+        second = store_model(self.model)
+        self.assertEqual(first.sha256, second.sha256)
+        self.assertEqual(ModelBlob.objects.count(), 1)
+        blob = ModelBlob.objects.get()
+        self.assertLess(len(bytes(blob.data)), blob.size)
+
+    def test_loads_from_node_cache_memory_mapped(self):
+        """Test a blob is fetched once, then loaded from disk without the database."""
+        import os
+        from ml.artifact_store import cache_path, load_blob, store_model
+        sha256 = store_model(self.model).sha256
+        os.remove(cache_path(sha256))
+
+        with self.assertNumQueries(2):  # fetch, then evict
+            model = load_blob(sha256)
+        self.assertTrue(os.path.exists(cache_path(sha256)))
+        self.assertIsInstance(model._predictors[0][0].nodes, np.memmap)
+        with self.assertNumQueries(0):
+            load_blob(sha256)
+
+    def test_cache_miss_evicts_deleted_blobs(self):
+        """Test a serving node drops cached files of blobs deleted elsewhere when it loads a new one."""
+        import os
+        from core.models import ModelBlob
+        from ml.artifact_store import cache_path, load_blob, store_model
+        old = store_model(self.model)
+        new = store_model(self.model.set_params(max_iter=6))
+        os.remove(cache_path(new.sha256))
+        ModelBlob.objects.filter(sha256=old.sha256).delete()  # pruned by the training node
+
+        load_blob(new.sha256)
+        self.assertFalse(os.path.exists(cache_path(old.sha256)))
+        self.assertTrue(os.path.exists(cache_path(new.sha256)))
+
+    def test_prune_blobs(self):
+        """Test blobs no artifact points to are deleted with their cached copy."""
+        import os
+        from core.models import ModelBlob
+        from ml.artifact_store import cache_path, prune_blobs, store_model
+        kept = store_model(self.model)
+        ModelArtifact.objects.create(name="m", blob=kept)
+        orphan = store_model(self.model.set_params(max_iter=6))
+        self.assertEqual(prune_blobs(), 1)
+        self.assertEqual(list(ModelBlob.objects.values_list("sha256", flat=True)), [kept.sha256])
+        self.assertFalse(os.path.exists(cache_path(orphan.sha256)))
+
+
+class StoredPredictionTest(TempArtifactCacheMixin, TestCase):
+    """Test persisting and serving stored predictions."""
+
+    def setUp(self):
+        super().setUp()
+        from sklearn.linear_model import LogisticRegression
+        from ml.artifact_store import store_model
+        from ml.model_cache import model_cache
+        from ml.predict_spx import FEATURE_COLS
+
+        model_cache.invalidate()
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(40, len(FEATURE_COLS)))
+        y = (X[:, 0] > 0).astype(int)
+        self.artifact = ModelArtifact.objects.create(
+            name="spx_direction_logreg", blob=store_model(LogisticRegression().fit(X, y))
+        )
+
+        self.features = {col: 1.0 for col in FEATURE_COLS}
+        FeatureFrame.objects.create(date=date(2024, 3, 1), features=self.features)
+
+    def test_store_and_serve(self):
+        """Test the stored row is served without loading the model."""
+        from core.models import Prediction
+        from ml.predict_spx import store_latest_prediction, latest_spx_prediction, predict_latest_spx_direction
+
+        live = predict_latest_spx_direction()
+        stored = store_latest_prediction()
+        self.assertEqual((stored.model_id, stored.date), (self.artifact.id, date(2024, 3, 1)))
+        store_latest_prediction()  # idempotent per (model, date)
+        self.assertEqual(Prediction.objects.count(), 1)
+        # Features are joined from the FeatureFrame, not copied per Prediction
+        self.assertEqual(Prediction.objects.get().details, {"label": live["label"]})
+
+        with patch("ml.predict_spx.load_model", side_effect=AssertionError("scored live")):
+            with self.assertNumQueries(3):
+                served = latest_spx_prediction()
+        self.assertEqual(served, live)
+
+    def test_falls_back_to_live_scoring(self):
+        """Test newer features without a stored prediction are scored live."""
+        from ml.predict_spx import store_latest_prediction, latest_spx_prediction
+        store_latest_prediction()
+        FeatureFrame.objects.create(date=date(2024, 3, 4), features=self.features)
+        self.assertEqual(latest_spx_prediction()["date"], date(2024, 3, 4))
+
+    def test_backfill(self):
+        """Test vectorized scoring of every FeatureFrame matches live scoring."""
+        from core.models import Prediction
+        from ml.predict_spx import FEATURE_COLS, backfill_predictions, load_model, score_feature_row
+        for day in range(2, 12):
+            FeatureFrame.objects.create(
+                date=date(2024, 2, day),
+                features={col: float(day - 7 + i) for i, col in enumerate(FEATURE_COLS)},
+            )
+        FeatureFrame.objects.create(date=date(2024, 2, 1), features={"spx_close": 1.0})  # incomplete: skipped
+
+        self.assertEqual(backfill_predictions(), 11)
+        self.assertEqual(backfill_predictions(), 11)  # upserts in place
+        self.assertEqual(Prediction.objects.count(), 11)
+
+        # Unchanged model: only new dates and revised features are scored
+        self.assertEqual(backfill_predictions(stale_only=True), 0)
+        FeatureFrame.objects.create(date=date(2024, 2, 12), features=self.features)
+        self.assertEqual(backfill_predictions(stale_only=True), 1)
+        self.assertEqual(Prediction.objects.count(), 12)
+
+        model = load_model()
+        for ff in FeatureFrame.objects.exclude(date=date(2024, 2, 1)):
+            stored = Prediction.objects.get(model=self.artifact, date=ff.date)
+            live = score_feature_row(ff, model)
+            self.assertAlmostEqual(stored.yhat, live["prob_up"])
+            self.assertEqual(stored.details["label"], live["label"])
+
+    def test_revised_features_are_rescored(self):
+        """Test a revised latest row is re-scored by a stale-only backfill and served."""
+        from ml.predict_spx import backfill_predictions, latest_spx_prediction, predict_latest_spx_direction
+        backfill_predictions()
+        before = latest_spx_prediction()["prob_up"]
+
+        ff = FeatureFrame.objects.get(date=date(2024, 3, 1))
+        ff.features = {**self.features, "spx_close": 40.0, "vix_close": -30.0}
+        ff.save()
+        self.assertEqual(backfill_predictions(stale_only=True), 1)
+        self.assertEqual(backfill_predictions(stale_only=True), 0)
+
+        served = latest_spx_prediction()
+        self.assertEqual(served, predict_latest_spx_direction())
+        self.assertNotAlmostEqual(served["prob_up"], before)
+        self.assertEqual(served["features"]["spx_close"], 40.0)
+
+    def test_predictions_endpoint(self):
+        """Test /api/predictions/ ranges and model selection."""
+        from rest_framework.test import APIClient
+        from ml.predict_spx import backfill_predictions
+        FeatureFrame.objects.create(date=date(2024, 3, 2), features=self.features)
+        backfill_predictions()
+        client = APIClient()
+
+        payload = client.get("/api/predictions/?start=2024-03-02").json()
+        self.assertEqual(payload["model"]["id"], self.artifact.id)
+        self.assertEqual([row["date"] for row in payload["data"]], ["2024-03-02"])
+        self.assertIn(payload["data"][0]["label"], (0, 1))
+
+        self.assertEqual(client.get(f"/api/predictions/?model={self.artifact.id}").json()["count"], 2)
+        self.assertEqual(client.get("/api/predictions/?model=unknown").status_code, 404)
+        self.assertEqual(client.get("/api/predictions/?end=soon").status_code, 400)
+
+    def test_predictions_endpoint_pages(self):
+        """Test /api/predictions/ pages with a capped limit and rejects unknown parameters."""
+        from rest_framework.test import APIClient
+        from ml.predict_spx import backfill_predictions
+        for day in range(2, 7):
+            FeatureFrame.objects.create(date=date(2024, 3, day), features=self.features)
+        backfill_predictions()
+        client = APIClient()
+
+        pages, url = [], "/api/predictions/?limit=2&start=2024-03-02"
+        while url:
+            payload = client.get(url).json()
+            pages.append([row["date"] for row in payload["data"]])
+            cursor = payload["next_cursor"]
+            url = cursor and f"/api/predictions/?limit=2&start=2024-03-02&cursor={cursor}"
+        self.assertEqual(pages, [["2024-03-02", "2024-03-03"], ["2024-03-04", "2024-03-05"], ["2024-03-06"]])
+        self.assertIsNone(client.get("/api/predictions/").json()["next_cursor"])
+
+        for query in ("limit=0", "limit=100000", "limit=many", "cursor=%%%", "max_points=10", "models=1"):
+            self.assertEqual(client.get(f"/api/predictions/?{query}").status_code, 400, query)
+
+
+class WalkForwardBacktestTest(TempArtifactCacheMixin, TestCase):
+    """Test walk-forward splits and the backtest engine."""
+
+    def test_splits(self):
+        """Test expanding and rolling windows never train on the test rows."""
+        from ml.backtest import walk_forward_splits
+        self.assertEqual(
+            walk_forward_splits(10, min_train=4, test_size=3),
+            [(0, 4, 4, 7), (0, 7, 7, 10)],
+        )
+        self.assertEqual(
+            walk_forward_splits(10, min_train=4, test_size=3, step=2, window="rolling"),
+            [(0, 4, 4, 7), (2, 6, 6, 9), (4, 8, 8, 10)],
+        )
+        self.assertEqual(walk_forward_splits(3, min_train=4, test_size=3), [])
+
+    def test_backtest_metrics_and_parallel_folds(self):
+        """Test per-fold metrics, regime breakdown and identical parallel results."""
+        from sklearn.linear_model import LogisticRegression
+        from ml.backtest import walk_forward_backtest, vix_regimes
+        rng = np.random.default_rng(1)
+        X = rng.normal(size=(300, 3))
+        y = (X[:, 0] + 0.3 * rng.normal(size=300) > 0).astype(int)
+        vix = rng.uniform(10, 35, size=300)
+        dates = np.datetime64("2020-01-01") + np.arange(300)
+
+        kwargs = dict(regimes=vix_regimes(vix), dates=dates, min_train=100, test_size=50)
+        sequential = walk_forward_backtest(LogisticRegression(), X, y, n_jobs=1, **kwargs)
+        parallel = walk_forward_backtest(LogisticRegression(), X, y, n_jobs=2, **kwargs)
+        self.assertEqual(sequential, parallel)
+
+        self.assertEqual(sequential["summary"]["scored_folds"], 4)
+        first = sequential["folds"][0]
+        self.assertEqual((first["train_rows"], first["n"]), (100, 50))
+        self.assertEqual(first["test_start"], "2020-04-10")
+        self.assertGreater(sequential["overall"]["accuracy"], 0.8)
+        self.assertGreater(sequential["overall"]["auc"], 0.9)
+        regimes = sequential["overall"]["hit_rate_by_regime"]
+        self.assertEqual(sum(r["n"] for r in regimes.values()), 200)
+
+    def test_training_stores_backtest(self):
+        """Test training records the walk-forward backtest in the artifact metrics."""
+        from ml.predict_spx import FEATURE_COLS
+        from ml.train_spx_model import train_spx_direction_model
+        # A fresh score cache, so the search really runs
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for name, value in (("MODEL_SEARCH_CACHE_DIR", tmp.name), ("MODEL_SEARCH_N_JOBS", 1)):
+            patcher = patch(f"ml.model_search.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        rng = np.random.default_rng(2)
+        frames = []
+        for i in range(800):
+            features = {col: float(v) for col, v in zip(FEATURE_COLS, rng.normal(size=len(FEATURE_COLS)))}
+            features["vix_close"] = 20.0
+            frames.append(FeatureFrame(
+                date=date(2020, 1, 1) + timedelta(days=i),
+                features=features,
+                label=int(features["spx_ret_1d"] > 0),
+            ))
+        FeatureFrame.objects.bulk_create(frames)
+        _spx_bar(date(2022, 3, 11))
+
+        train_spx_direction_model()
+        metrics = ModelArtifact.objects.get().metrics
+        self.assertEqual(metrics["backtest"]["summary"]["scored_folds"], 1)
+        self.assertEqual(metrics["backtest"]["folds"][0]["test_start"], "2021-12-31")
+        self.assertEqual(metrics["accuracy"], metrics["backtest"]["overall"]["accuracy"])
+        self.assertEqual(list(metrics["backtest"]["overall"]["hit_rate_by_regime"]), ["normal"])
+        # The search winner is promoted
+        winner = metrics["search"]["results"][0]
+        self.assertEqual(metrics["model"], {"family": winner["family"], "params": winner["params"]})
+        self.assertEqual((metrics["mode"], metrics["rows"]), ("full", 800))
+        self.assertEqual(metrics["trained_through"], "2022-03-10")
+        self.assertEqual((metrics["search"]["evaluated"], metrics["search"]["cached"]), (9, 0))
+
+        # ...unless a nightly-updatable candidate is within the tolerance
+        with patch("ml.train_spx_model.INCREMENTAL_PROMOTION_TOLERANCE", 1.0):
+            metrics = train_spx_direction_model(full=True).metrics
+        best_sgd = next(r for r in metrics["search"]["results"] if r["family"] == "sgd")
+        self.assertEqual(metrics["model"], {"family": "sgd", "params": best_sgd["params"]})
+        self.assertEqual(metrics["search"]["cached"], 9)
+
+
+class ModelSearchTest(TestCase):
+    """Test the model-family / hyperparameter search."""
+
+    def setUp(self):
+        from ml.model_search import ScoreCache
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ScoreCache(self.tmp.name)
+        rng = np.random.default_rng(3)
+        self.X = rng.normal(size=(240, 3))
+        # Non-linear target: trees should beat a linear model
+        self.y = ((self.X[:, 0] > 0) ^ (self.X[:, 1] > 0)).astype(int)
+        self.candidates = [("logreg", {"C": 1.0}), ("gbt", {"learning_rate": 0.1, "max_depth": 3})]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_search_ranks_and_caches(self):
+        """Test the best family wins and a second run is served from the cache."""
+        from ml.model_search import search_models
+        first = search_models(self.X, self.y, self.candidates, n_splits=3, n_jobs=1, cache=self.cache)
+        self.assertEqual(first["best"]["family"], "gbt")
+        self.assertEqual((first["evaluated"], first["cached"]), (2, 0))
+        self.assertEqual(first["best"]["folds"], 3)
+
+        second = search_models(self.X, self.y, self.candidates, n_splits=3, n_jobs=1, cache=self.cache)
+        self.assertEqual((second["evaluated"], second["cached"]), (0, 2))
+        self.assertEqual(second["best"]["log_loss"], first["best"]["log_loss"])
+
+        # New data: new fingerprint, nothing cached
+        third = search_models(self.X[:-1], self.y[:-1], self.candidates, n_splits=3, n_jobs=1, cache=self.cache)
+        self.assertEqual(third["cached"], 0)
+
+    def test_budget_stops_after_first_batch(self):
+        """Test an exhausted budget still evaluates the first (incumbent) batch."""
+        from ml.model_search import search_models
+        result = search_models(self.X, self.y, self.candidates, n_splits=3, n_jobs=1, budget_seconds=0, cache=self.cache)
+        self.assertEqual((result["evaluated"], result["skipped_for_budget"]), (1, 1))
+        self.assertEqual(result["best"]["family"], "logreg")
+
+
+class IncrementalTrainingTest(TempArtifactCacheMixin, TestCase):
+    """Test incremental model updates and the fallbacks to a full retrain."""
+
+    def setUp(self):
+        super().setUp()
+        from ml.model_cache import model_cache
+        from ml.predict_spx import FEATURE_COLS
+        model_cache.invalidate()
+        rng = np.random.default_rng(4)
+        frames = []
+        for i in range(60):
+            features = {col: float(v) for col, v in zip(FEATURE_COLS, rng.normal(size=len(FEATURE_COLS)))}
+            frames.append(FeatureFrame(
+                date=date(2024, 1, 1) + timedelta(days=i),
+                features=features,
+                label=int(features["spx_ret_1d"] > 0),
+            ))
+        FeatureFrame.objects.bulk_create(frames)
+        _spx_bar(date(2024, 3, 1))
+
+    def _parent(self, family="sgd", params=None, **metrics):
+        """Artifact fit on the first 50 days, as a full retrain would save it."""
+        from ml.artifact_store import store_model
+        from ml.model_search import make_estimator
+        from ml.predict_spx import FEATURE_COLS, SPX_MODEL_NAME
+        from ml.train_spx_model import load_training_rows, training_fingerprint
+        df = load_training_rows().iloc[:50]
+        model = make_estimator(family, params or {"alpha": 1e-3}).fit(df[FEATURE_COLS].values, df["label"].values)
+        base = {
+            "model": {"family": family, "params": params or {"alpha": 1e-3}},
+            "backtest": {"overall": {"log_loss": 0.5}},
+            "mode": "full",
+            "full_trained_on": date.today().isoformat(),
+            "trained_through": "2024-02-19",
+            "rows": 50,
+            "fingerprint": training_fingerprint(df),
+            "drift": {"n": 0, "log_loss_sum": 0.0},
+        }
+        base.update(metrics)
+        return ModelArtifact.objects.create(name=SPX_MODEL_NAME, blob=store_model(model), metrics=base)
+
+    def test_partial_fit_streams_scaling(self):
+        """Test partial_fit updates the standardization with the new rows."""
+        from ml.incremental import IncrementalLogit
+        rng = np.random.default_rng(5)
+        X = rng.normal(loc=3.0, size=(150, 2))
+        y = (X[:, 0] > 3.0).astype(int)
+        model = IncrementalLogit().fit(X[:100], y[:100])
+        model.partial_fit(X[100:], y[100:])
+        self.assertEqual(model.scaler_.n_samples_seen_, 150)
+        np.testing.assert_allclose(model.scaler_.mean_, X.mean(axis=0))
+        self.assertEqual(model.predict_proba(X).shape, (150, 2))
+
+    def test_update_uses_only_new_rows(self):
+        """Test a new artifact is derived from the latest one with the 10 new days."""
+        from ml.train_spx_model import train_spx_direction_model
+        parent = self._parent()
+        with patch("ml.train_spx_model.full_retrain_spx_direction_model") as full:
+            child = train_spx_direction_model()
+        full.assert_not_called()
+        self.assertNotEqual(child.id, parent.id)
+        self.assertEqual(child.metrics["mode"], "incremental")
+        self.assertEqual(child.metrics["parent"], parent.id)
+        self.assertEqual((child.metrics["trained_through"], child.metrics["rows"]), ("2024-02-29", 60))
+        self.assertEqual(child.metrics["drift"]["n"], 10)
+        self.assertEqual(child.metrics["full_trained_on"], parent.metrics["full_trained_on"])
+
+        self.assertEqual(child.metrics["fingerprint"]["rows"], 60)
+
+        # Same training rows: nothing is trained or saved
+        self.assertEqual(train_spx_direction_model().id, child.id)
+        self.assertEqual(ModelArtifact.objects.count(), 2)
+
+    def test_changed_history_forces_retrain(self):
+        """Test a revised row before the training cutoff can't be patched incrementally."""
+        from ml.train_spx_model import train_spx_direction_model
+        parent = self._parent()
+        ff = FeatureFrame.objects.order_by("date").first()
+        ff.label = 1 - ff.label
+        ff.save()
+        with patch("ml.train_spx_model.full_retrain_spx_direction_model", return_value=parent) as full:
+            train_spx_direction_model()
+        full.assert_called_once()
+
+    def test_nightly_runs_keep_prediction_history(self):
+        """Test train -> store predictions -> prune nights score only changed dates and keep every prediction."""
+        from rest_framework.test import APIClient
+        from core.models import ModelBlob, Observation, Prediction
+        from ml.model_cache import load_artifact
+        from ml.predict_spx import store_predictions
+        from ml.train_spx_model import train_spx_direction_model
+        Observation.objects.all().delete()
+        _spx_bar(date(2024, 2, 20))
+        unused = self._parent()
+        parent = self._parent()
+        self.assertEqual(store_predictions(parent, new_artifact=True), 60)
+
+        children = []
+        with patch("ml.train_spx_model.MODEL_ARTIFACTS_KEPT", 2):
+            for bar in (date(2024, 2, 22), date(2024, 2, 24), date(2024, 2, 26)):
+                _spx_bar(bar)
+                children.append(train_spx_direction_model())
+                store_predictions(children[-1], new_artifact=True)
+        self.assertEqual(
+            [c.metrics["scores_from"] for c in children], ["2024-02-20", "2024-02-22", "2024-02-24"]
+        )
+
+        # Unreferenced old artifacts go; referenced ones stay without their model
+        self.assertFalse(ModelArtifact.objects.filter(id=unused.id).exists())
+        self.assertEqual(ModelArtifact.objects.count(), 4)
+        self.assertEqual(Prediction.objects.count(), 60 + 10 + 8 + 6)
+        self.assertEqual(ModelBlob.objects.count(), 2)
+        with self.assertRaises(RuntimeError):
+            load_artifact(parent.id)
+
+        # Per date, the newest artifact that scored it
+        rows = APIClient().get("/api/predictions/").json()["data"]
+        by_date = {row["date"]: row["model_id"] for row in rows}
+        self.assertEqual(len(rows), 60)
+        self.assertEqual(
+            [by_date[d] for d in ("2024-02-19", "2024-02-21", "2024-02-23", "2024-02-29")],
+            [parent.id] + [c.id for c in children],
+        )
+
+    def test_provisional_labels_are_not_trained_on(self):
+        """Test the newest row's relabel (once the next bar lands) doesn't force a full retrain."""
+        from core.models import Observation
+        from ml.train_spx_model import train_spx_direction_model
+        Observation.objects.all().delete()
+        _spx_bar(date(2024, 2, 25))
+        self._parent()
+        with patch("ml.train_spx_model.full_retrain_spx_direction_model") as full:
+            child = train_spx_direction_model()
+            self.assertEqual(child.metrics["trained_through"], "2024-02-24")
+
+            provisional = FeatureFrame.objects.get(date=date(2024, 2, 25))
+            provisional.label = 1 - provisional.label
+            provisional.save()
+            _spx_bar(date(2024, 2, 27))
+            grandchild = train_spx_direction_model()
+        full.assert_not_called()
+        self.assertEqual(grandchild.metrics["parent"], child.id)
+        self.assertEqual(grandchild.metrics["trained_through"], "2024-02-26")
+
+    def test_non_incremental_models_keep_serving(self):
+        """Test a model without partial_fit tracks drift in place until it forces a full retrain."""
+        from ml.train_spx_model import train_spx_direction_model
+        parent = self._parent("logreg", {"C": 1.0})
+        with patch("ml.train_spx_model.full_retrain_spx_direction_model") as full:
+            self.assertEqual(train_spx_direction_model().id, parent.id)
+            parent.refresh_from_db()
+            self.assertEqual(parent.metrics["drift"]["n"], 10)
+            self.assertEqual(parent.metrics["drift_through"], "2024-02-29")
+            self.assertEqual(parent.metrics["trained_through"], "2024-02-19")
+
+            # The same rows aren't counted twice
+            self.assertEqual(train_spx_direction_model().id, parent.id)
+            _spx_bar(date(2024, 3, 2))
+            FeatureFrame.objects.create(date=date(2024, 3, 1), features=FeatureFrame.objects.last().features, label=1)
+            train_spx_direction_model()
+            parent.refresh_from_db()
+            self.assertEqual(parent.metrics["drift"]["n"], 11)
+        full.assert_not_called()
+        self.assertEqual(ModelArtifact.objects.count(), 1)
+
+        # Drift past the backtest's log-loss forces a full retrain
+        parent.metrics["drift"] = {"n": 20, "log_loss_sum": 20.0}
+        parent.save()
+        _spx_bar(date(2024, 3, 3))
+        FeatureFrame.objects.create(date=date(2024, 3, 2), features=FeatureFrame.objects.last().features, label=0)
+        with patch("ml.train_spx_model.full_retrain_spx_direction_model", return_value=parent) as full:
+            train_spx_direction_model()
+        full.assert_called_once()
+
+    def test_incremental_updates_can_be_disabled(self):
+        """Test MODEL_INCREMENTAL_UPDATES=0 keeps serving a partial_fit model instead of updating it."""
+        from ml.train_spx_model import train_spx_direction_model
+        parent = self._parent()
+        with patch("ml.train_spx_model.MODEL_INCREMENTAL_UPDATES", False):
+            self.assertEqual(train_spx_direction_model().id, parent.id)
+        parent.refresh_from_db()
+        self.assertEqual(parent.metrics["drift"]["n"], 10)
+        self.assertEqual(ModelArtifact.objects.count(), 1)
+
+    def test_full_flag_forces_retrain(self):
+        """Test full=True skips the incremental path."""
+        from ml.train_spx_model import train_spx_direction_model
+        parent = self._parent()
+        with patch("ml.train_spx_model.full_retrain_spx_direction_model", return_value=parent) as full:
+            train_spx_direction_model(full=True)
+        full.assert_called_once()
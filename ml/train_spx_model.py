@@ -1,77 +1,324 @@
-from typing import List
-from io import BytesIO
+from datetime import date, timedelta
+import hashlib
+import os
+from typing import Any, Dict, Optional
 
+import numpy as np
 import pandas as pd
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-import joblib
+from django.db.models import Max
+from sklearn.metrics import log_loss
 
-from core.models import FeatureFrame, ModelArtifact
+from core.models import ModelArtifact, Observation, Prediction
+from ml.artifact_store import prune_blobs, store_model
+from ml.backtest import walk_forward_backtest, vix_regimes
+from ml.feature_matrix import load_feature_frame
+from ml.model_cache import load_artifact, model_cache
+from ml.model_search import DEFAULT_CANDIDATES, make_estimator, search_models
+from ml.predict_spx import FEATURE_COLS, SPX_MODEL_NAME
 
-def load_featureframe_as_dataframe() -> pd.DataFrame:
-    qs = FeatureFrame.objects.exclude(label__isnull = True).order_by("date")
+# Between full retrains, fold new rows into models that support
+# partial_fit; other models keep serving while their drift is tracked.
+MODEL_INCREMENTAL_UPDATES = os.getenv("MODEL_INCREMENTAL_UPDATES", "1") == "1"
 
-    records = []
-    for ff in qs:
-        row = {"date": ff.date, "label": ff.label}
-        for k,v in ff.features.items():
-            row[k] = v
-        records.append(row)
+# Promote the best partial_fit candidate over the search winner when its
+# log-loss is at most this much higher (0: always keep the winner).
+INCREMENTAL_PROMOTION_TOLERANCE = float(os.getenv("INCREMENTAL_PROMOTION_TOLERANCE", "0"))
 
-    if not records:
-        raise RuntimeError("No labeled FeatureFrame rows found.")
+# Retrain from scratch (search + backtest + fit) at least this often.
+FULL_RETRAIN_DAYS = int(os.getenv("FULL_RETRAIN_DAYS", "7"))
+
+# Retrain from scratch once the model's log-loss on rows labeled after its
+# training cutoff, scored before it learns them, exceeds the last
+# backtest's by this factor...
+DRIFT_LOG_LOSS_RATIO = float(os.getenv("DRIFT_LOG_LOSS_RATIO", "1.15"))
+
+# ...measured over at least this many rows.
+DRIFT_MIN_ROWS = int(os.getenv("DRIFT_MIN_ROWS", "20"))
+
+# Latest artifacts of a model kept whole; older ones are kept without
+# their model only while Predictions reference them.
+MODEL_ARTIFACTS_KEPT = int(os.getenv("MODEL_ARTIFACTS_KEPT", "5"))
 
-    df = pd.DataFrame.from_records(records)
+
+def load_featureframe_as_dataframe() -> pd.DataFrame:
+    """Labeled FeatureFrame rows as columns (see ml.feature_matrix), oldest first."""
+    df = load_feature_frame(FEATURE_COLS, labeled_only=True)
+    if df.empty:
+        raise RuntimeError("No labeled FeatureFrame rows found.")
     return df
 
-def train_spx_direction_model() -> None:
+
+def load_training_rows() -> pd.DataFrame:
+    """
+    Labeled FeatureFrame rows with every feature present and a final
+    label, oldest first.
+    """
     df = load_featureframe_as_dataframe()
     print("Loaded FeatureFrame data:", df.shape)
 
-    feature_cols: List[str] = [
-        "spx_close",
-        "spx_ret_1d",
-        "vix_close",
-        "spy_volume",
-        "cpi_level",
-        "unrate",
-        "us10y",
-        "us2y",
-        "term_spread_10y_2y",
-    ]
-
-    df = df.dropna(subset = feature_cols + ["label"])
+    df = df.dropna(subset = FEATURE_COLS + ["label"])
     print("After dropping NA:", df.shape)
 
+    # Without a later SPX bar, "tomorrow" falls back to today's close and
+    # the label is a provisional 0 until the next bar lands.
+    last_bar = Observation.objects.filter(series__code="SPX_CLOSE").aggregate(last=Max("date"))["last"]
+    df = df[df["date"] < pd.Timestamp(last_bar)] if last_bar is not None else df.iloc[0:0]
+    print("After dropping provisional labels:", df.shape)
+    if df.empty:
+        raise RuntimeError("No FeatureFrame rows with a final label found.")
+    return df
+
+
+def supports_incremental(family: Optional[str], params: Optional[Dict[str, Any]]) -> bool:
+    """Whether a candidate's model can be updated with partial_fit."""
+    try:
+        return hasattr(make_estimator(family, params or {}), "partial_fit")
+    except (TypeError, ValueError):
+        return False
+
 
-    X = df[feature_cols].values
-    y = df["label"].values
+def training_fingerprint(df: pd.DataFrame) -> Dict[str, Any]:
+    """Row count, last date and a hash of the dates, features and labels of training rows."""
+    digest = hashlib.sha1()
+    digest.update(df["date"].values.astype("datetime64[D]").astype(np.int64).tobytes())
+    digest.update(np.ascontiguousarray(df[FEATURE_COLS].values, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(df["label"].values, dtype=np.int64).tobytes())
+    return {
+        "rows": len(df),
+        "max_date": df["date"].max().date().isoformat() if len(df) else None,
+        "hash": digest.hexdigest(),
+    }
 
-    # Use 20% for testing, ensuring we use all available data for training
-    # For very large datasets, this gives us a substantial test set while maximizing training data
-    test_size = 0.2
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=42, stratify=y
+
+def prune_model_artifacts(name: str = SPX_MODEL_NAME, keep: Optional[int] = None) -> int:
+    """
+    Prune `name` artifacts older than the latest `keep` (default
+    MODEL_ARTIFACTS_KEPT). Those no Prediction references are deleted;
+    the others stay as the record of the Predictions they made, but
+    release their model blob (see ml.artifact_store.prune_blobs).
+    Returns how many artifacts were deleted.
+    """
+    keep = MODEL_ARTIFACTS_KEPT if keep is None else keep
+    old = list(
+        ModelArtifact.objects.filter(name=name).order_by("-id").values_list("id", flat=True)[keep:]
     )
+    if not old:
+        return 0
+    referenced = set(Prediction.objects.filter(model_id__in=old).values_list("model_id", flat=True).distinct())
+    ModelArtifact.objects.filter(id__in=referenced, blob__isnull=False).update(blob=None)
+    deleted, _ = ModelArtifact.objects.filter(id__in=set(old) - referenced).delete()
+    return deleted
+
+
+def _save_artifact(model, metrics: Dict[str, Any]) -> ModelArtifact:
+    # Compressed, deduplicated by content hash (see ml.artifact_store)
+    artifact = ModelArtifact.objects.create(name=SPX_MODEL_NAME, blob=store_model(model), metrics=metrics)
+    # Serve the new model from this process right away
+    model_cache.invalidate(SPX_MODEL_NAME)
+    pruned = prune_model_artifacts()
+    pruned_blobs = prune_blobs()
+    if pruned or pruned_blobs:
+        print(f"Pruned {pruned} old model artifacts, {pruned_blobs} unused blobs")
+    return artifact
+
+
+def full_retrain_spx_direction_model(df: pd.DataFrame, fingerprint: Dict[str, Any]) -> ModelArtifact:
+    """
+    Search, backtest and fit the SPX direction model on every training
+    row. The search winner is fit, unless a candidate that supports
+    partial_fit is within INCREMENTAL_PROMOTION_TOLERANCE of its log-loss.
+    """
+    X = df[FEATURE_COLS].values
+    y = df["label"].values.astype(int)
+
+    # Pick the model family / hyperparameters with time-series CV
+    try:
+        search = search_models(X, y)
+        best = search["best"]
+        print(
+            f"Model search: best {best['family']} {best['params']} (log-loss {best['log_loss']:.4f}); "
+            f"{search['evaluated']} evaluated, {search['cached']} cached, "
+            f"{search['skipped_for_budget']} skipped for budget"
+        )
+        if INCREMENTAL_PROMOTION_TOLERANCE > 0:
+            updatable = [r for r in search["results"] if supports_incremental(r["family"], r["params"])]
+            if (
+                updatable and updatable[0] is not best
+                and updatable[0]["log_loss"] - best["log_loss"] <= INCREMENTAL_PROMOTION_TOLERANCE
+            ):
+                best = updatable[0]
+                print(f"Promoting incrementally updatable {best['family']} {best['params']} (log-loss {best['log_loss']:.4f})")
+        family, params = best["family"], best["params"]
+    except RuntimeError as e:
+        print(f"Skipping model search: {e}")
+        search = None
+        family, params = DEFAULT_CANDIDATES[0]
+
+    # Walk-forward evaluation of the winner: every fold trains only on earlier days
+    try:
+        backtest = walk_forward_backtest(
+            make_estimator(family, params),
+            X,
+            y,
+            regimes=vix_regimes(df["vix_close"].values),
+            dates=df["date"].values.astype("datetime64[D]"),
+        )
+        acc = backtest["overall"]["accuracy"] if backtest["overall"] else None
+        summary = backtest["summary"]
+        print(f"Walk-forward: {summary['scored_folds']} folds, out-of-sample accuracy {acc}, mean AUC {summary['mean_auc']}")
+    except RuntimeError as e:
+        print(f"Skipping backtest: {e}")
+        backtest, acc = None, None
 
-    model = LogisticRegression(max_iter = 1000)
-    model.fit(X_train, y_train)
-
-    y_pred = model.predict(X_test)
-    acc = accuracy_score(y_test, y_pred)
-    print(f"Test accuracy: {acc:.3f}")
-
-    # Save model to database as binary blob for persistence
-    # Use BytesIO to serialize model to bytes
-    buffer = BytesIO()
-    joblib.dump(model, buffer)
-    model_bytes = buffer.getvalue()
-    buffer.close()
-    
-    ModelArtifact.objects.create(
-        name="spx_direction_logreg",
-        data=model_bytes,
-        metrics={"accuracy": acc},
+    # The selected candidate is fit on every labeled day
+    model = make_estimator(family, params)
+    model.fit(X, y)
+
+    artifact = _save_artifact(
+        model,
+        {
+            "accuracy": acc,
+            "model": {"family": family, "params": params},
+            "search": search and {
+                "results": search["results"],
+                "evaluated": search["evaluated"],
+                "cached": search["cached"],
+                "skipped_for_budget": search["skipped_for_budget"],
+            },
+            "backtest": backtest,
+            "mode": "full",
+            # Every stored prediction changes
+            "scores_from": None,
+            "full_trained_on": date.today().isoformat(),
+            "trained_through": df["date"].max().date().isoformat(),
+            "rows": len(df),
+            "fingerprint": fingerprint,
+            # Log-loss on rows labeled later, scored before they are learned
+            "drift": {"n": 0, "log_loss_sum": 0.0},
+        },
     )
-    print(f"Saved model to database with accuracy: {acc:.3f}")
\ No newline at end of file
+    print(f"Saved model to database with out-of-sample accuracy: {acc}")
+    return artifact
+
+
+def full_retrain_reason(artifact: Optional[ModelArtifact]) -> Optional[str]:
+    """Why `artifact` needs a full retrain before new rows (None if it doesn't)."""
+    if artifact is None:
+        return "no model trained yet"
+    metrics = artifact.metrics or {}
+    if not {"trained_through", "full_trained_on", "fingerprint"} <= metrics.keys():
+        return "artifact has no training cutoff"
+
+    if date.fromisoformat(metrics["full_trained_on"]) + timedelta(days=FULL_RETRAIN_DAYS) <= date.today():
+        return f"last full retrain is over {FULL_RETRAIN_DAYS} days old"
+
+    drift = metrics.get("drift") or {}
+    baseline = ((metrics.get("backtest") or {}).get("overall") or {}).get("log_loss")
+    if baseline and drift.get("n", 0) >= DRIFT_MIN_ROWS:
+        recent = drift["log_loss_sum"] / drift["n"]
+        if recent > baseline * DRIFT_LOG_LOSS_RATIO:
+            return f"log-loss drifted to {recent:.4f} (backtest {baseline:.4f})"
+    return None
+
+
+def _add_drift(metrics: Dict[str, Any], model, new_rows: pd.DataFrame) -> Dict[str, Any]:
+    """
+    `metrics`' drift plus the model's log-loss on those of `new_rows` it
+    hasn't been scored on yet: an out-of-sample drift signal.
+    """
+    drift = dict(metrics.get("drift") or {"n": 0, "log_loss_sum": 0.0})
+    unseen = new_rows[new_rows["date"] > pd.Timestamp(metrics.get("drift_through", metrics["trained_through"]))]
+    if len(unseen):
+        y = unseen["label"].values.astype(int)
+        proba = model.predict_proba(unseen[FEATURE_COLS].values)[:, 1]
+        drift["n"] += len(y)
+        drift["log_loss_sum"] += float(log_loss(y, proba, labels=[0, 1])) * len(y)
+    return drift
+
+
+def update_spx_direction_model(
+    parent: ModelArtifact, new_rows: pd.DataFrame, fingerprint: Dict[str, Any]
+) -> ModelArtifact:
+    """
+    Fold `new_rows` (the rows labeled since `parent` was trained) into a
+    copy of its model (partial_fit) and save the result as a new artifact.
+    """
+    # Fresh, writable copy: the cached instance keeps serving until the new one is saved
+    model = load_artifact(parent.id, mmap_mode=None)
+    # Score the new rows before learning them
+    drift = _add_drift(parent.metrics, model, new_rows)
+
+    model.partial_fit(new_rows[FEATURE_COLS].values, new_rows["label"].values.astype(int))
+
+    metrics = dict(parent.metrics)
+    metrics.pop("drift_through", None)
+    metrics.pop("drift_fingerprint", None)
+    metrics.update(
+        mode="incremental",
+        parent=parent.id,
+        # Only predictions of the rows learned here (and later ones) change
+        scores_from=(pd.Timestamp(parent.metrics["trained_through"]) + pd.Timedelta(days=1)).date().isoformat(),
+        trained_through=new_rows["date"].max().date().isoformat(),
+        rows=fingerprint["rows"],
+        fingerprint=fingerprint,
+        drift=drift,
+    )
+    artifact = _save_artifact(model, metrics)
+    print(f"Updated model with {len(new_rows)} new rows through {metrics['trained_through']} (artifact {artifact.id})")
+    return artifact
+
+
+def track_spx_direction_drift(
+    artifact: ModelArtifact, new_rows: pd.DataFrame, fingerprint: Dict[str, Any]
+) -> ModelArtifact:
+    """
+    Score `new_rows` (the rows labeled since `artifact` was trained) with
+    its model, which isn't updated incrementally, and add them to its
+    drift. The artifact keeps serving; its metrics are updated in place.
+    """
+    metrics = dict(artifact.metrics)
+    metrics["drift"] = _add_drift(metrics, load_artifact(artifact.id), new_rows)
+    metrics.update(
+        drift_through=new_rows["date"].max().date().isoformat() if len(new_rows) else metrics["trained_through"],
+        drift_fingerprint=fingerprint,
+    )
+    artifact.metrics = metrics
+    artifact.save(update_fields=["metrics"])
+    print(f"Tracked drift of artifact {artifact.id} over {len(new_rows)} rows since {metrics['trained_through']}")
+    return artifact
+
+
+def train_spx_direction_model(full: bool = False) -> ModelArtifact:
+    """
+    Bring the SPX direction model up to date. Nothing is trained when the
+    training rows match those the latest artifact last saw (unless
+    `full`). Otherwise, with MODEL_INCREMENTAL_UPDATES, a model that
+    supports partial_fit is updated with only the rows labeled since its
+    training cutoff; any other model keeps serving and those rows count
+    towards its drift. With `full`, every FULL_RETRAIN_DAYS days, when
+    earlier rows changed, or when the log-loss on new rows drifts above
+    the last backtest's, the model is retrained from scratch.
+    """
+    df = load_training_rows()
+    fingerprint = training_fingerprint(df)
+    latest = ModelArtifact.objects.filter(name=SPX_MODEL_NAME).order_by("-id").first()
+    seen = latest is not None and fingerprint in (
+        (latest.metrics or {}).get("fingerprint"),
+        (latest.metrics or {}).get("drift_fingerprint"),
+    )
+    if not full and seen:
+        print(f"Training data unchanged since artifact {latest.id}; skipping training")
+        return latest
+
+    reason = "requested" if full else full_retrain_reason(latest)
+    if reason is None:
+        cutoff = pd.Timestamp(latest.metrics["trained_through"])
+        if training_fingerprint(df[df["date"] <= cutoff]) == latest.metrics["fingerprint"]:
+            new_rows = df[df["date"] > cutoff]
+            model = latest.metrics.get("model") or {}
+            if MODEL_INCREMENTAL_UPDATES and supports_incremental(model.get("family"), model.get("params")):
+                return update_spx_direction_model(latest, new_rows, fingerprint)
+            return track_spx_direction_drift(latest, new_rows, fingerprint)
+        reason = f"rows through {cutoff.date()} changed"
+    print(f"Full retrain: {reason}")
+    return full_retrain_spx_direction_model(df, fingerprint)
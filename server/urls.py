@@ -20,8 +20,11 @@ from django.urls import path
 from core.views import (
     DashboardView,
     SPXDirectionView,
+    PredictionListView,
     TimeSeriesView,
+    TimeSeriesBatchView,
     MacroSnapshotView,
+    DashboardBundleView,
     NewsListView,
     UpdateDataView,
     MigrateView,
@@ -33,8 +36,11 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("dashboard/", DashboardView.as_view(), name="dashboard"),
     path("api/spx-direction/", SPXDirectionView.as_view(), name="spx-direction"),
+    path("api/predictions/", PredictionListView.as_view(), name="predictions"),
     path("api/timeseries/", TimeSeriesView.as_view(), name="timeseries"),
+    path("api/timeseries/batch/", TimeSeriesBatchView.as_view(), name="timeseries-batch"),
     path("api/macro-snapshot/", MacroSnapshotView.as_view(), name="macro-snapshot"),
+    path("api/dashboard/", DashboardBundleView.as_view(), name="dashboard-bundle"),
     path("api/news/", NewsListView.as_view(), name="news-list"),
     path("api/status/", StatusView.as_view(), name="status"),
     path("api/migrate/", MigrateView.as_view(), name="migrate"),